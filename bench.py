@@ -0,0 +1,192 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from collector import ProcCollector
+from fakeproc import FakeCollector, FakeSystem, ProcWriter
+from history import History
+from proctable import ProcessTable
+from search import SearchIndex
+
+# Per-tick cost of the refresh pipeline on synthetic process tables:
+#   collect   collector.snapshot()
+#   annotate  history and search index updates
+#   filter    the search query (its result is only counted; later phases see
+#             every process, as with an empty search box)
+#   diff      keyed diff against the previous tick
+#   sort      typed sort by cpu
+#   render    pushing the tick into a real Treeview (needs a display or Xvfb)
+# Runs are seeded, so the same arguments replay the same churn.
+
+PHASES = ("collect", "annotate", "filter", "diff", "sort", "render")
+FIELDS = ("pid", "name", "cpu", "history", "cpu_1m", "cpu_5m", "memory", "user", "cmdline")
+
+
+def percentile(values, q):
+    return float(np.percentile(values, q)) if values else float("nan")
+
+
+class Renderer:
+    # A hidden Tk window holding the same widgets the GUI drives
+    def __init__(self, mode):
+        import tkinter as tk
+        from tkinter import ttk
+        from treeindex import TreeIndex
+        from virtuallist import VirtualList
+
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.tree = ttk.Treeview(self.root, columns=FIELDS, show="headings", height=40)
+        self.tree.pack()
+        scrollbar = ttk.Scrollbar(self.root, orient=tk.VERTICAL)
+        self.mode = mode
+        self.tree_index = TreeIndex(self.tree, FIELDS, FIELDS, None)
+        self.virtual_list = VirtualList(self.tree, scrollbar, FIELDS)
+        if mode == "virtual":
+            self.virtual_list.attach()
+
+    def start(self, table):
+        self.tree.delete(*self.tree.get_children())
+        self.virtual_list.clear()
+        self.tree_index.clear(table)
+
+    def render(self, table, sort):
+        if self.mode == "virtual":
+            self.virtual_list.set_table(table.sorted(*sort))
+        else:
+            self.tree_index.update(table, sort)
+        self.root.update_idletasks()
+
+    def close(self):
+        self.root.destroy()
+
+
+def make_renderer(mode):
+    if mode == "none":
+        return None
+    if sys.platform.startswith("linux") and not os.environ.get("DISPLAY"):
+        if not shutil.which("Xvfb"):
+            print("render: skipped, no display and no Xvfb", file=sys.stderr)
+            return None
+        from bench_startup import start_xvfb
+        server, os.environ["DISPLAY"] = start_xvfb()
+        renderer = Renderer(mode)
+        renderer.server = server
+        return renderer
+    return Renderer(mode)
+
+
+def run(processes, args, renderer):
+    system = FakeSystem(processes, churn=args.churn, busy=args.busy, seed=args.seed)
+    proc_root = None
+    if args.proc_files:
+        proc_root = tempfile.mkdtemp(prefix="fakeproc-")
+        writer = ProcWriter(system, proc_root)
+        writer.sync()
+        collector = ProcCollector(proc_root)
+        # cpu% follows the simulated clock, not the time spent writing files
+        collector.clock = lambda: system.uptime / 100
+    else:
+        collector = FakeCollector(system, realtime=False)
+    history = History()
+    search_index = SearchIndex(collector.names)
+    sort = ("cpu", True)
+    timings = {phase: [] for phase in PHASES}
+    previous = None
+    if renderer is not None:
+        renderer.start(history.annotate(ProcessTable.empty(collector.names)))
+
+    try:
+        for tick in range(args.warmup + args.ticks):
+            system.step(1.0)
+            if args.proc_files:
+                writer.sync()
+            now = float(tick)
+            marks = [time.perf_counter()]
+            snapshot = collector.snapshot()
+            marks.append(time.perf_counter())
+            history.update(snapshot, now)
+            snapshot = history.annotate(snapshot, now)
+            search_index.update(snapshot)
+            marks.append(time.perf_counter())
+            matched = len(search_index.search(args.query, snapshot))
+            marks.append(time.perf_counter())
+            if previous is not None:
+                snapshot.diff(previous)
+            marks.append(time.perf_counter())
+            snapshot.argsort(*sort)
+            marks.append(time.perf_counter())
+            if renderer is not None:
+                renderer.render(snapshot, sort)
+            marks.append(time.perf_counter())
+            previous = snapshot
+
+            if tick >= args.warmup:
+                for phase, begin, end in zip(PHASES, marks, marks[1:]):
+                    timings[phase].append(end - begin)
+    finally:
+        if proc_root is not None:
+            shutil.rmtree(proc_root, ignore_errors=True)
+
+    result = {"processes": processes, "matched": matched}
+    total = [sum(values) for values in zip(*(timings[phase] for phase in PHASES))]
+    for phase in PHASES + ("total",):
+        values = total if phase == "total" else timings[phase]
+        if phase == "render" and renderer is None:
+            continue
+        mean = statistics.fmean(values)
+        result[phase] = {"p50_ms": percentile(values, 50) * 1000, "p99_ms": percentile(values, 99) * 1000,
+                         "rows_per_s": processes / mean if mean else float("inf")}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the refresh pipeline on synthetic processes")
+    parser.add_argument("--processes", default="1000,10000,100000",
+                        help="comma separated table sizes")
+    parser.add_argument("--ticks", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--churn", type=float, default=0.01, help="fraction of processes replaced per tick")
+    parser.add_argument("--busy", type=float, default=0.05, help="fraction of processes using cpu per tick")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--query", default="name~py cpu>1", help="search query timed by the filter phase")
+    parser.add_argument("--proc-files", action="store_true",
+                        help="collect by parsing a fake /proc tree on disk instead of in memory")
+    parser.add_argument("--render", choices=("list", "virtual", "none"), default="list")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    renderer = make_renderer(args.render)
+    results = []
+    try:
+        for processes in (int(value) for value in args.processes.split(",")):
+            result = run(processes, args, renderer)
+            results.append(result)
+            print(f"{processes} processes, {result['matched']} matched by the query")
+            for phase in PHASES + ("total",):
+                if phase in result:
+                    stats = result[phase]
+                    print(f"  {phase:>9}: p50 {stats['p50_ms']:9.2f} ms  p99 {stats['p99_ms']:9.2f} ms  "
+                          f"{stats['rows_per_s']:14,.0f} rows/s")
+    finally:
+        if renderer is not None:
+            renderer.close()
+            if hasattr(renderer, "server"):
+                renderer.server.kill()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": platform.python_version(), "numpy": np.__version__, "machine": platform.machine(),
+                       "cpus": os.cpu_count(), "arguments": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
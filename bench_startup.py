@@ -0,0 +1,120 @@
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+# Start-up benchmark for the GUI. Every run is a fresh interpreter, timed from
+# spawn to: imports done, first process list painted, and Performance tab shown
+# for the first time. Results can be appended to a JSON-lines log, and a run
+# that is much slower than the previous logged one fails.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# time.monotonic() is one system-wide clock on Linux and macOS, so the child's
+# readings compare directly with the spawn time taken here
+CHILD = """
+import json, sys, time
+spawned = float(sys.argv[1])
+import iter4
+imported = time.monotonic()
+app = iter4.TaskManagerApp()
+app.update()
+painted = time.monotonic()
+rows = len(app.tree.get_children())
+app.notebook.select(app.performance_frame)
+app.update()
+performance = time.monotonic()
+app.on_close()
+print(json.dumps({"import": imported - spawned, "first_paint": painted - spawned,
+                  "performance_tab": performance - painted, "rows": rows}))
+"""
+PHASES = ("import", "first_paint", "performance_tab")
+
+
+def start_xvfb():
+    # Headless machines get a private X server; -displayfd picks a free display
+    read_fd, write_fd = os.pipe()
+    server = subprocess.Popen(["Xvfb", "-displayfd", str(write_fd), "-screen", "0", "1280x800x24", "-nolisten", "tcp"],
+                              pass_fds=(write_fd,), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        display = f.readline().strip()
+    if not display:
+        server.kill()
+        raise RuntimeError("Xvfb did not start")
+    return server, f":{display}"
+
+
+def run_once(env):
+    spawned = time.monotonic()
+    result = subprocess.run([sys.executable, "-c", CHILD, repr(spawned)], cwd=HERE, env=env,
+                            capture_output=True, text=True)
+    if result.returncode:
+        raise RuntimeError(f"GUI run failed:\n{result.stderr.strip()}")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=HERE, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def last_logged(path):
+    try:
+        with open(path) as f:
+            lines = [line for line in f if line.strip()]
+    except OSError:
+        return None
+    return json.loads(lines[-1]) if lines else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure GUI start-up time to first paint")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--log", help="append the result to this JSON-lines file and compare with its last entry")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="fail when the median first paint is this fraction slower than the logged one")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    server = None
+    if sys.platform.startswith("linux") and not env.get("DISPLAY"):
+        if not shutil.which("Xvfb"):
+            sys.exit("No X display: set DISPLAY or install Xvfb")
+        server, env["DISPLAY"] = start_xvfb()
+    try:
+        # One unmeasured run warms the page cache, so runs compare like with like
+        run_once(env)
+        runs = [run_once(env) for _ in range(args.runs)]
+    finally:
+        if server is not None:
+            server.kill()
+
+    result = {"time": time.time(), "revision": git_revision(), "runs": len(runs), "rows": runs[-1]["rows"]}
+    for phase in PHASES:
+        values = sorted(run[phase] * 1000 for run in runs)
+        result[phase] = {"median_ms": round(statistics.median(values), 1), "min_ms": round(values[0], 1),
+                         "max_ms": round(values[-1], 1)}
+        print(f"{phase:>16}: median {result[phase]['median_ms']:7.1f} ms  "
+              f"min {result[phase]['min_ms']:7.1f}  max {result[phase]['max_ms']:7.1f}")
+
+    if args.log:
+        previous = last_logged(args.log)
+        with open(args.log, "a") as f:
+            f.write(json.dumps(result) + "\n")
+        if previous is not None:
+            before = previous["first_paint"]["median_ms"]
+            now = result["first_paint"]["median_ms"]
+            if now > before * (1 + args.tolerance):
+                sys.exit(f"first paint regressed: {now:.1f} ms, was {before:.1f} ms at {previous['revision']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,395 @@
+import heapq
+import os
+import pwd
+import time
+from collections import namedtuple
+from operator import itemgetter
+
+import numpy as np
+
+from proctable import NameTable, TableBuilder
+
+# Only the fallback collectors need psutil, and importing it takes longer than a
+# whole /proc scan, so require_psutil() loads it on first use
+psutil = None
+
+# Position of the Top-N ranking value in the rows built by the cheap pass
+TOP_KEYS = {"cpu": itemgetter(3), "memory": itemgetter(4)}
+
+# cpu and cores in %, memory in MB, throughputs in MB/s
+SystemSample = namedtuple("SystemSample", "cpu cores memory_used disk_read disk_write net_rx net_tx")
+
+
+def require_psutil():
+    global psutil
+    if psutil is None:
+        try:
+            import psutil as module
+        except ImportError:
+            raise RuntimeError("psutil is required when /proc is not available") from None
+        psutil = module
+    return psutil
+
+
+class AttributeCache:
+    # Per-process attributes that never change (user, command line, ...), keyed
+    # by (pid, start time) so that a reused pid misses instead of inheriting the
+    # old process's values. retain() evicts the processes that are gone.
+    def __init__(self):
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, load, *args):
+        entry = self.entries.get(key)
+        if entry is None:
+            self.misses += 1
+            entry = self.entries[key] = load(*args)
+        else:
+            self.hits += 1
+        return entry
+
+    def peek(self, key, default=None):
+        # Cached value or default, without loading or counting
+        return self.entries.get(key, default)
+
+    def retain(self, live):
+        # live: the (pid, start) keys seen by the latest scan
+        entries = {key: entry for key, entry in self.entries.items() if key in live}
+        self.evictions += len(self.entries) - len(entries)
+        self.entries = entries
+
+    def stats(self):
+        return {"entries": len(self.entries), "hits": self.hits, "misses": self.misses,
+                "evictions": self.evictions}
+
+
+class ProcCollector:
+    # Reads /proc/[pid]/stat for every process in one pass. Everything the
+    # process table needs (name, ppid, cpu ticks, start time, rss) is on that one line.
+    def __init__(self, proc_root="/proc"):
+        self.proc_root = proc_root
+        self.num_cpus = os.cpu_count() or 1
+        self.clk_tck = os.sysconf("SC_CLK_TCK")
+        self.page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+        self.names = NameTable()
+        self.prev_ticks = {}
+        self.prev_time = None
+        # (n, column) keeps only the n largest rows by that column
+        self.top = None
+        self.details = AttributeCache()
+        self.users = {}
+
+    def clock(self):
+        return time.monotonic()
+
+    def pids(self):
+        return [int(entry) for entry in os.listdir(self.proc_root) if entry.isdigit()]
+
+    def read_stat(self, pid):
+        with open(f"{self.proc_root}/{pid}/stat", "rb") as f:
+            data = f.read()
+        # The name is wrapped in parentheses and may itself contain spaces or ')'
+        lpar = data.index(b"(")
+        rpar = data.rindex(b")")
+        fields = data[rpar + 2:].split()
+        ppid = int(fields[1])
+        ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        start = int(fields[19])
+        rss = int(fields[21])
+        return data[lpar + 1:rpar], ppid, ticks, start, rss
+
+    def read_user(self, pid):
+        try:
+            uid = os.stat(f"{self.proc_root}/{pid}").st_uid
+        except OSError:
+            return ""
+        user = self.users.get(uid)
+        if user is None:
+            try:
+                user = pwd.getpwuid(uid).pw_name
+            except KeyError:
+                user = str(uid)
+            self.users[uid] = user
+        return user
+
+    def read_cmdline(self, pid):
+        try:
+            with open(f"{self.proc_root}/{pid}/cmdline", "rb") as f:
+                data = f.read()
+        except OSError:
+            return ""
+        return data.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace")
+
+    def load_details(self, pid):
+        return self.read_user(pid), self.read_cmdline(pid)
+
+    def read_details(self, pid, start):
+        # user and cmdline cost extra syscalls and do not change for the life of a
+        # process, so they are read once per (pid, start)
+        return self.details.get((pid, start), self.load_details, pid)
+
+    def scan(self, fields=None):
+        # Cheap pass over every process: numbers only, names left as raw bytes.
+        # fields limits what is refreshed; memory not in it keeps its last value.
+        now = self.clock()
+        memory_due = fields is None or "memory" in fields
+        elapsed = now - self.prev_time if self.prev_time is not None else 0.0
+        scale = 100.0 / (elapsed * self.clk_tck * self.num_cpus) if elapsed > 0 else 0.0
+
+        rows = []
+        ticks_seen = {}
+        for pid in self.pids():
+            try:
+                name, ppid, ticks, start, rss = self.read_stat(pid)
+            except (OSError, ValueError, IndexError):
+                # Process exited between listdir and open
+                continue
+
+            prev = self.prev_ticks.get(pid)
+            if prev is not None and prev[0] == start:
+                cpu = (ticks - prev[1]) * scale
+                memory = rss * self.page_mb if memory_due else prev[2]
+            else:
+                cpu = 0.0
+                memory = rss * self.page_mb
+            ticks_seen[pid] = (start, ticks, memory)
+            rows.append((pid, start, name, cpu, memory, ppid))
+
+        self.prev_ticks = ticks_seen
+        self.prev_time = now
+        self.details.retain({(pid, seen[0]) for pid, seen in ticks_seen.items()})
+        return rows
+
+    def snapshot(self, details=True, fields=None):
+        # details=False skips reading user and cmdline for processes not seen
+        # before, for a quick first paint
+        rows = self.scan(fields)
+        top = self.top
+        if top is not None:
+            rows = heapq.nlargest(top[0], rows, key=TOP_KEYS[top[1]])
+
+        table = TableBuilder(self.names)
+        for pid, start, name, cpu, memory, ppid in rows:
+            if details:
+                user, cmdline = self.read_details(pid, start)
+            else:
+                user, cmdline = self.details.peek((pid, start), ("", ""))
+            table.append(pid, start, name.decode("utf-8", "replace"), cpu, memory, user, cmdline, ppid)
+        return table.build()
+
+
+class PsutilCollector:
+    # Portable fallback for platforms without a Linux-style /proc
+    def __init__(self):
+        require_psutil()
+        self.num_cpus = psutil.cpu_count() or 1
+        self.names = NameTable()
+        self.top = None
+        self.details = AttributeCache()
+        # (pid, start) -> memory MB, reused on ticks that do not refresh memory
+        self.memory = {}
+
+    def load_details(self, proc):
+        # name is cached with the rest, so process_iter never has to ask for it
+        with proc.oneshot():
+            details = []
+            for attr in ('name', 'username', 'cmdline'):
+                try:
+                    details.append(getattr(proc, attr)())
+                except psutil.Error:
+                    details.append(None)
+        name, user, cmdline = details
+        return name or "", user or "", " ".join(cmdline or ())
+
+    def read_details(self, proc, start):
+        return self.details.get((proc.pid, start), self.load_details, proc)
+
+    def quick_name(self, proc):
+        try:
+            return proc.name()
+        except psutil.Error:
+            return ""
+
+    def snapshot(self, details=True, fields=None):
+        # Each psutil attribute is a separate call, so memory_info is only asked
+        # for on ticks that refresh memory, and for processes not seen before
+        memory_due = fields is None or "memory" in fields
+        attrs = ['cpu_percent', 'create_time', 'ppid'] + (['memory_info'] if memory_due else [])
+        rows = []
+        memory_seen = {}
+        for proc in psutil.process_iter(attrs):
+            info = proc.info
+            start = int((info['create_time'] or 0.0) * 100)
+            key = (proc.pid, start)
+            if memory_due or key not in self.memory:
+                try:
+                    memory_info = info['memory_info'] if memory_due else proc.memory_info()
+                except psutil.Error:
+                    memory_info = None
+                if memory_info is None:
+                    continue
+                memory = memory_info.rss / (1024 * 1024)
+            else:
+                memory = self.memory[key]
+            cpu = (info['cpu_percent'] or 0.0) / self.num_cpus
+            memory_seen[key] = memory
+            rows.append((proc, start, None, cpu, memory, info['ppid'] or 0))
+        self.memory = memory_seen
+
+        top = self.top
+        if top is not None:
+            rows = heapq.nlargest(top[0], rows, key=TOP_KEYS[top[1]])
+
+        table = TableBuilder(self.names)
+        for proc, start, _, cpu, memory, ppid in rows:
+            if details or (proc.pid, start) in self.details:
+                name, user, cmdline = self.read_details(proc, start)
+            else:
+                name, user, cmdline = self.quick_name(proc), "", ""
+            table.append(proc.pid, start, name, cpu, memory, user, cmdline, ppid)
+        self.details.retain(memory_seen)
+        return table.build()
+
+
+class SystemCollector:
+    # Host-wide counters for the Performance tab: /proc/stat, /proc/meminfo,
+    # /proc/diskstats and /proc/net/dev are each read once per sample() call.
+    def __init__(self, proc_root="/proc", sys_root="/sys"):
+        self.proc_root = proc_root
+        try:
+            self.disks = {disk for disk in os.listdir(f"{sys_root}/block")
+                          if not disk.startswith(("loop", "ram"))}
+        except OSError:
+            self.disks = None
+        self.memory_total = self.read_meminfo()[0]
+        self.prev = None
+
+    def read_cpu_times(self):
+        # (busy, total) jiffies for the aggregate "cpu" line followed by each core
+        times = []
+        with open(f"{self.proc_root}/stat", "rb") as f:
+            for line in f:
+                if not line.startswith(b"cpu"):
+                    break
+                times.append(line.split()[1:9])
+        times = np.array(times, dtype=np.int64)
+        idle = times[:, 3] + times[:, 4]  # idle + iowait
+        total = times.sum(axis=1)
+        return np.column_stack((total - idle, total))
+
+    def read_meminfo(self):
+        values = {}
+        with open(f"{self.proc_root}/meminfo", "rb") as f:
+            for line in f:
+                key, value = line.split(b":", 1)
+                values[key] = int(value.split()[0]) / 1024
+        return values[b"MemTotal"], values[b"MemTotal"] - values.get(b"MemAvailable", values[b"MemFree"])
+
+    def read_disk_bytes(self):
+        read = write = 0
+        with open(f"{self.proc_root}/diskstats", "rb") as f:
+            for line in f:
+                fields = line.split()
+                if self.disks is None or fields[2].decode() in self.disks:
+                    read += int(fields[5])
+                    write += int(fields[9])
+        return read * 512, write * 512
+
+    def read_net_bytes(self):
+        rx = tx = 0
+        with open(f"{self.proc_root}/net/dev", "rb") as f:
+            for line in f.readlines()[2:]:
+                iface, counters = line.split(b":", 1)
+                if iface.strip() == b"lo":
+                    continue
+                counters = counters.split()
+                rx += int(counters[0])
+                tx += int(counters[8])
+        return rx, tx
+
+    def sample(self):
+        now = time.monotonic()
+        cpu_times = self.read_cpu_times()
+        counters = np.array(self.read_disk_bytes() + self.read_net_bytes(), dtype=np.float64)
+        memory_used = self.read_meminfo()[1]
+
+        if self.prev is None or len(self.prev[1]) != len(cpu_times):
+            busy = np.zeros(len(cpu_times))
+            rates = np.zeros(4)
+        else:
+            prev_time, prev_cpu, prev_counters = self.prev
+            delta = cpu_times - prev_cpu
+            busy = 100.0 * delta[:, 0] / np.maximum(delta[:, 1], 1)
+            rates = (counters - prev_counters) / (now - prev_time) / (1024 * 1024)
+        self.prev = (now, cpu_times, counters)
+        return SystemSample(busy[0], busy[1:], memory_used, *rates)
+
+
+class PsutilSystemCollector:
+    def __init__(self):
+        require_psutil()
+        self.memory_total = psutil.virtual_memory().total / (1024 * 1024)
+        self.prev = None
+
+    def sample(self):
+        now = time.monotonic()
+        cores = np.array(psutil.cpu_percent(percpu=True))
+        disk = psutil.disk_io_counters()
+        net = psutil.net_io_counters()
+        counters = np.array([disk.read_bytes, disk.write_bytes, net.bytes_recv, net.bytes_sent] if disk else
+                            [0, 0, net.bytes_recv, net.bytes_sent], dtype=np.float64)
+        if self.prev is None:
+            rates = np.zeros(4)
+        else:
+            rates = (counters - self.prev[1]) / (now - self.prev[0]) / (1024 * 1024)
+        self.prev = (now, counters)
+        memory_used = psutil.virtual_memory().used / (1024 * 1024)
+        return SystemSample(cores.mean(), cores, memory_used, *rates)
+
+
+def default_backend():
+    # TASK_MANAGER_BACKEND=fake runs any front end on a synthetic process table
+    backend = os.environ.get("TASK_MANAGER_BACKEND")
+    if backend:
+        return backend
+    return "proc" if os.path.exists("/proc/self/stat") else "psutil"
+
+
+def make_collector(backend=None):
+    backend = backend or default_backend()
+    if backend == "proc":
+        return ProcCollector()
+    if backend == "psutil":
+        return PsutilCollector()
+    if backend == "fake":
+        from fakeproc import FakeCollector
+        return FakeCollector()
+    raise ValueError(f"Unknown collector backend: {backend}")
+
+
+def make_system_collector(backend=None):
+    backend = backend or default_backend()
+    if backend == "fake":
+        # Host-wide graphs stay real; only the process table is synthetic
+        backend = "proc" if os.path.exists("/proc/self/stat") else "psutil"
+    if backend == "proc":
+        return SystemCollector()
+    if backend == "psutil":
+        return PsutilSystemCollector()
+    raise ValueError(f"Unknown collector backend: {backend}")
+
+
+if __name__ == "__main__":
+    collector = make_collector()
+    collector.snapshot()
+    time.sleep(1)
+    for pid, name, cpu, memory in collector.snapshot().sorted("cpu", reverse=True).rows():
+        print(f"{pid:>8} {name:<24} {cpu:6.1f} {memory:10.1f}")
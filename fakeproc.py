@@ -0,0 +1,171 @@
+import os
+import random
+import shutil
+
+from collector import ProcCollector
+
+# Synthetic process tables for benchmarks and for trying the front ends on a
+# quiet machine. FakeSystem simulates processes that spawn, exit, burn cpu and
+# grow; FakeCollector reads it through ProcCollector's own scan, and ProcWriter
+# lays it out as a /proc-style tree for ProcCollector(proc_root=...).
+
+NAMES = ("python", "node", "bash", "postgres", "nginx", "java", "gunicorn", "make", "cc1", "sshd",
+         "redis-server", "chrome", "containerd-shim", "celery", "ld")
+USERS = ("root", "www-data", "postgres", "ci", "build", "nobody")
+CLK_TCK = 100
+PAGE_SIZE = 4096
+PID_MAX = 1 << 22
+# Linux restarts pid allocation above the range reserved for early daemons
+PID_WRAP = 300
+
+# Positions in a FakeSystem process record
+PPID, NAME, START, TICKS, RSS, USER, CMDLINE = range(7)
+
+
+class FakeSystem:
+    def __init__(self, processes=1000, churn=0.01, busy=0.05, seed=0, pid_max=PID_MAX):
+        # churn: fraction of processes replaced per simulated second
+        # busy: fraction of processes that use cpu in a given second
+        self.random = random.Random(seed)
+        self.churn = churn
+        self.busy = busy
+        self.pid_max = pid_max
+        self.uptime = 0
+        self.next_pid = 1
+        self.processes = {}
+        self.children = {}
+        # pid list with positions, for O(1) random picks and removal
+        self.pid_list = []
+        self.position = {}
+        self.spawn(0)
+        while len(self.processes) < processes:
+            self.spawn(self.random.choice(self.pid_list))
+
+    def __len__(self):
+        return len(self.processes)
+
+    def allocate_pid(self):
+        pid = self.next_pid
+        while pid in self.processes:
+            pid = pid + 1 if pid + 1 < self.pid_max else PID_WRAP
+        self.next_pid = pid + 1 if pid + 1 < self.pid_max else PID_WRAP
+        return pid
+
+    def spawn(self, ppid):
+        rng = self.random
+        pid = self.allocate_pid()
+        name = rng.choice(NAMES)
+        cmdline = f"{name} --worker {rng.randrange(64)} --queue q{rng.randrange(1000)}"
+        rss = int(rng.lognormvariate(8, 1.5))
+        self.processes[pid] = [ppid, name, self.uptime, 0, rss, rng.choice(USERS), cmdline]
+        self.children[pid] = set()
+        if ppid in self.children:
+            self.children[ppid].add(pid)
+        self.position[pid] = len(self.pid_list)
+        self.pid_list.append(pid)
+        return pid
+
+    def exit(self, pid):
+        ppid = self.processes.pop(pid)[PPID]
+        # Orphans are re-parented to init, as the kernel does without a subreaper
+        for child in self.children.pop(pid):
+            self.processes[child][PPID] = 1
+            self.children[1].add(child)
+        if ppid in self.children:
+            self.children[ppid].discard(pid)
+        last = self.pid_list.pop()
+        if last != pid:
+            at = self.position[pid]
+            self.pid_list[at] = last
+            self.position[last] = at
+        del self.position[pid]
+
+    def step(self, seconds=1.0):
+        rng = self.random
+        ticks = max(1, int(seconds * CLK_TCK))
+        self.uptime += ticks
+        expected = self.churn * seconds * len(self.processes)
+        changes = int(expected) + (rng.random() < expected % 1)
+        exits = [pid for pid in rng.sample(self.pid_list, min(changes, len(self.pid_list))) if pid != 1]
+        for pid in exits:
+            self.exit(pid)
+        for _ in exits:
+            self.spawn(rng.choice(self.pid_list))
+        for pid in rng.sample(self.pid_list, int(self.busy * len(self.pid_list))):
+            process = self.processes[pid]
+            process[TICKS] += rng.randrange(ticks + 1)
+            process[RSS] = max(1, process[RSS] + rng.randrange(-64, 65))
+
+
+class FakeCollector(ProcCollector):
+    # ProcCollector over a FakeSystem instead of /proc. With realtime=True the
+    # system advances by the wall time between snapshots, so the GUI sees live
+    # churn; benchmarks pass realtime=False and call system.step() themselves.
+    def __init__(self, system=None, realtime=True):
+        super().__init__(proc_root=None)
+        if system is None:
+            system = FakeSystem(int(os.environ.get("TASK_MANAGER_FAKE_PROCESSES", 2000)))
+        self.system = system
+        self.realtime = realtime
+        self.clk_tck = CLK_TCK
+        self.page_mb = PAGE_SIZE / (1024 * 1024)
+        self.last_step = None
+
+    def clock(self):
+        return self.system.uptime / CLK_TCK
+
+    def pids(self):
+        return list(self.system.pid_list)
+
+    def read_stat(self, pid):
+        process = self.system.processes[pid]
+        return process[NAME].encode(), process[PPID], process[TICKS], process[START], process[RSS]
+
+    def read_user(self, pid):
+        return self.system.processes[pid][USER]
+
+    def read_cmdline(self, pid):
+        return self.system.processes[pid][CMDLINE]
+
+    def snapshot(self, details=True, fields=None):
+        if self.realtime:
+            now = super().clock()
+            if self.last_step is not None:
+                self.system.step(now - self.last_step)
+            self.last_step = now
+        return super().snapshot(details, fields)
+
+
+class ProcWriter:
+    # Mirrors a FakeSystem into a /proc-style directory. Only files whose
+    # contents changed since the last sync() are rewritten.
+    def __init__(self, system, root):
+        self.system = system
+        self.root = root
+        self.written = {}
+        os.makedirs(root, exist_ok=True)
+
+    def stat_line(self, pid, process):
+        return (f"{pid} ({process[NAME]}) S {process[PPID]} {pid} {pid} 0 -1 4194560 0 0 0 0 "
+                f"{process[TICKS]} 0 0 0 20 0 1 0 {process[START]} {process[RSS] * PAGE_SIZE} {process[RSS]} "
+                f"18446744073709551615 0 0 0 0 0 0 0 0 0 0 0 0 17 0 0 0 0 0 0\n")
+
+    def sync(self):
+        processes = self.system.processes
+        for pid in set(self.written) - set(processes):
+            shutil.rmtree(f"{self.root}/{pid}", ignore_errors=True)
+            del self.written[pid]
+        for pid, process in processes.items():
+            entry = (process[START], self.stat_line(pid, process))
+            written = self.written.get(pid)
+            if written == entry:
+                continue
+            directory = f"{self.root}/{pid}"
+            # A new process, possibly under a reused pid, gets a fresh command line
+            if written is None or written[0] != entry[0]:
+                os.makedirs(directory, exist_ok=True)
+                with open(f"{directory}/cmdline", "w") as f:
+                    f.write(process[CMDLINE].replace(" ", "\0") + "\0")
+            with open(f"{directory}/stat", "w") as f:
+                f.write(entry[1])
+            self.written[pid] = entry
@@ -0,0 +1,114 @@
+import time
+
+import numpy as np
+
+SPARK_CHARS = np.array(list(" ▁▂▃▄▅▆▇█"))
+SPARK_WIDTH = 16
+
+
+class History:
+    # Per-process cpu history in fixed-size ring buffers. Every tracked process
+    # owns one row of a preallocated float32 matrix; all rows share one write
+    # cursor and one timestamp ring, so a tick is a single vectorized store. A
+    # row is recycled as soon as its process leaves the snapshot, and at most
+    # max_processes rows ever exist, so memory is bounded whatever the churn.
+    def __init__(self, length=300, max_processes=8192):
+        self.length = length
+        self.max_processes = max_processes
+        self.times = np.full(length, -np.inf)
+        self.position = 0
+        self.samples = np.empty((0, length), dtype=np.float32)
+        self.slot_keys = np.empty(0, dtype=np.int64)
+
+    def grow(self, needed):
+        capacity = min(self.max_processes, max(needed, 2 * len(self.slot_keys), 256))
+        extra = capacity - len(self.slot_keys)
+        if extra > 0:
+            self.samples = np.vstack((self.samples, np.full((extra, self.length), np.nan, dtype=np.float32)))
+            self.slot_keys = np.concatenate((self.slot_keys, np.full(extra, -1, dtype=np.int64)))
+
+    def slots(self, keys):
+        # Slot of each key, or -1 for keys that are not tracked
+        order = np.argsort(self.slot_keys)
+        sorted_keys = self.slot_keys[order]
+        found = np.searchsorted(sorted_keys, keys).clip(0, max(len(sorted_keys) - 1, 0))
+        if not len(sorted_keys):
+            return np.full(len(keys), -1, dtype=np.int64)
+        return np.where(sorted_keys[found] == keys, order[found], -1)
+
+    def update(self, table, now=None):
+        now = time.monotonic() if now is None else now
+        keys = table.key
+
+        # Free the rows of processes that have gone away
+        gone = (self.slot_keys >= 0) & ~np.isin(self.slot_keys, keys)
+        self.slot_keys[gone] = -1
+        self.samples[gone] = np.nan
+
+        slots = self.slots(keys)
+        new = np.flatnonzero(slots < 0)
+        if len(new):
+            self.grow(int((self.slot_keys >= 0).sum()) + len(new))
+            free = np.flatnonzero(self.slot_keys < 0)[:len(new)]
+            # Past max_processes the overflow simply goes untracked
+            new = new[:len(free)]
+            self.slot_keys[free] = keys[new]
+            slots[new] = free
+
+        tracked = slots >= 0
+        self.samples[:, self.position] = np.nan
+        self.samples[slots[tracked], self.position] = table.cpu[tracked]
+        self.times[self.position] = now
+        self.position = (self.position + 1) % self.length
+
+    def window(self, slots, seconds, now):
+        recent = self.times >= now - seconds
+        values = self.samples[slots][:, recent]
+        count = (~np.isnan(values)).sum(axis=1)
+        total = np.nansum(values, axis=1)
+        return np.divide(total, count, out=np.zeros(len(slots)), where=count > 0)
+
+    def sparklines(self, slots):
+        width = min(SPARK_WIDTH, self.length)
+        recent = (self.position - width + np.arange(width)) % self.length
+        values = self.samples[slots][:, recent]
+        peak = np.fmax(np.nanmax(np.nan_to_num(values, nan=0.0), axis=1, keepdims=True), 1.0)
+        levels = np.where(np.isnan(values), 0, 1 + np.ceil(np.nan_to_num(values) / peak * 7)).astype(np.int64)
+        chars = np.ascontiguousarray(SPARK_CHARS[levels.clip(0, 8)])
+        return chars.view(f"<U{width}").reshape(-1).astype(object)
+
+    def annotate(self, table, now=None):
+        # Adds history, cpu_1m and cpu_5m columns; untracked rows get blanks
+        now = time.monotonic() if now is None else now
+        slots = self.slots(table.key)
+        tracked = slots >= 0
+        spark = np.full(len(table), "", dtype=object)
+        cpu_1m = np.zeros(len(table))
+        cpu_5m = np.zeros(len(table))
+        if tracked.any():
+            spark[tracked] = self.sparklines(slots[tracked])
+            cpu_1m[tracked] = self.window(slots[tracked], 60, now)
+            cpu_5m[tracked] = self.window(slots[tracked], 300, now)
+        columns = dict(table.columns, history=spark, cpu_1m=cpu_1m, cpu_5m=cpu_5m)
+        return type(table)(table.names, columns)
+
+
+class SeriesRing:
+    # The last n samples of one or more series. Every sample is stored twice, so
+    # the latest window is always a contiguous view and push() never allocates.
+    def __init__(self, n, rows=1):
+        self.n = n
+        self.data = np.full((rows, 2 * n), np.nan)
+        self.position = 0
+
+    def push(self, values):
+        i = self.position
+        self.data[:, i] = values
+        self.data[:, i + self.n] = values
+        self.position = (i + 1) % self.n
+
+    def window(self):
+        return self.data[:, self.position:self.position + self.n]
+
+    def peak(self):
+        return float(np.nanmax(self.window(), initial=0.0))
@@ -1,228 +1,513 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, filedialog
-import psutil
-import subprocess
-import threading
-import queue
-import time
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.animation as animation
-
-
-class TaskManagerApp(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("Task Manager")
-        self.geometry("800x600")
-        self.create_widgets()
-        self.process_queue = queue.Queue()
-        self.stop_event = threading.Event()
-        self.search_var.trace("w", self.debounce_search)
-        self.update_process_list()
-
-    def create_widgets(self):
-        # Create a notebook
-        self.notebook = ttk.Notebook(self)
-        self.notebook.pack(fill=tk.BOTH, expand=True)
-
-        # Create a frame for the Processes tab
-        self.processes_frame = tk.Frame(self.notebook)
-        self.notebook.add(self.processes_frame, text="Processes")
-
-        # Create a frame for the Performance tab
-        self.performance_frame = tk.Frame(self.notebook)
-        self.notebook.add(self.performance_frame, text="Performance")
-
-        # Add content to Processes tab
-        self.create_processes_tab()
-
-        # Add content to Performance tab
-        self.create_performance_tab()
-
-    def create_processes_tab(self):
-        search_frame = tk.Frame(self.processes_frame)
-        search_frame.pack(pady=10)
-
-        tk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=5)
-        self.search_var = tk.StringVar()
-        search_entry = tk.Entry(search_frame, textvariable=self.search_var)
-        search_entry.pack(side=tk.LEFT, padx=5)
-
-        search_button = tk.Button(search_frame, text="Search", command=self.search_process)
-        search_button.pack(side=tk.LEFT, padx=5)
-
-        reset_button = tk.Button(search_frame, text="Reset", command=self.reset_search)
-        reset_button.pack(side=tk.LEFT, padx=5)
-
-        columns = ("pid", "name", "cpu (%)", "memory (MB)")
-        self.tree = ttk.Treeview(self.processes_frame, columns=columns, show='headings')
-
-        for col in columns:
-            self.tree.heading(col, text=col.capitalize(), command=lambda c=col: self.sort_by_column(c, False))
-        self.tree.pack(fill=tk.BOTH, expand=True)
-
-        self.terminate_button = tk.Button(self.processes_frame, text="Terminate Process",
-                                          command=self.terminate_process)
-        self.terminate_button.pack(pady=10)
-
-        self.create_button = tk.Button(self.processes_frame, text="Create Process", command=self.create_process)
-        self.create_button.pack(pady=10)
-
-    # noinspection PyTypeChecker
-    def create_performance_tab(self):
-        self.fig, (self.ax_cpu, self.ax_memory) = plt.subplots(2, 1, figsize=(8, 6))
-        self.fig.tight_layout(pad=3.0)
-
-        self.cpu_data = []
-        self.memory_data = []
-        self.time_data = []
-        self.start_time = time.time()
-
-        self.ax_cpu.set_title('CPU Usage (%)')
-        self.ax_cpu.set_ylim(0, 100)
-        self.ax_cpu.set_xlabel('Time (s)')
-        self.ax_cpu.set_ylabel('CPU (%)')
-
-        self.ax_memory.set_title('Memory Usage (MB)')
-        self.ax_memory.set_ylim(0, psutil.virtual_memory().total / (1024 * 1024))
-        self.ax_memory.set_xlabel('Time (s)')
-        self.ax_memory.set_ylabel('Memory (MB)')
-
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.performance_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-        self.ani = animation.FuncAnimation(self.fig, self.update_performance_graphs, interval=1000)
-
-    def update_performance_graphs(self, frame):
-        current_time = time.time() - self.start_time
-        self.time_data.append(current_time)
-        self.cpu_data.append(psutil.cpu_percent())
-        self.memory_data.append(psutil.virtual_memory().used / (1024 * 1024))
-
-        if len(self.time_data) > 60:
-            self.time_data = self.time_data[-60:]
-            self.cpu_data = self.cpu_data[-60:]
-            self.memory_data = self.memory_data[-60:]
-
-        self.ax_cpu.clear()
-        self.ax_memory.clear()
-
-        self.ax_cpu.plot(self.time_data, self.cpu_data, label='CPU (%)')
-        self.ax_cpu.set_title('CPU Usage (%)')
-        self.ax_cpu.set_ylim(0, 100)
-        self.ax_cpu.set_xlabel('Time (s)')
-        self.ax_cpu.set_ylabel('CPU (%)')
-
-        self.ax_memory.plot(self.time_data, self.memory_data, label='Memory (MB)')
-        self.ax_memory.set_title('Memory Usage (MB)')
-        self.ax_memory.set_ylim(0, psutil.virtual_memory().total / (1024 * 1024))
-        self.ax_memory.set_xlabel('Time (s)')
-        self.ax_memory.set_ylabel('Memory (MB)')
-
-        self.fig.tight_layout(pad=3.0)
-        self.canvas.draw()
-
-    def sort_by_column(self, col, reverse):
-        l = [(self.tree.set(k, col), k) for k in self.tree.get_children('')]
-        l.sort(reverse=reverse)
-
-        for index, (val, k) in enumerate(l):
-            self.tree.move(k, '', index)
-
-        self.tree.heading(col, command=lambda: self.sort_by_column(col, not reverse))
-
-    def update_process_list(self, search_term=None):
-        self.stop_event.set()
-        self.stop_event = threading.Event()
-        thread = threading.Thread(target=self.fetch_process_list, args=(search_term,))
-        thread.start()
-        self.after(100, self.check_process_queue)
-
-    def fetch_process_list(self, search_term):
-        processes = []
-        num_cpus = psutil.cpu_count()
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_info']):
-            if self.stop_event.is_set():
-                return
-            pid = proc.info['pid']
-            name = proc.info['name']
-            cpu = proc.info['cpu_percent'] / num_cpus  # Normalize by number of CPUs
-            memory = proc.info['memory_info'].rss / (1024 * 1024)  # Convert to MB
-
-            if search_term:
-                if str(pid) == search_term or search_term.lower() in name.lower():
-                    processes.append((pid, name, cpu, memory))
-            else:
-                processes.append((pid, name, cpu, memory))
-
-        self.process_queue.put(processes)
-
-    def check_process_queue(self):
-        try:
-            processes = self.process_queue.get_nowait()
-        except queue.Empty:
-            self.after(100, self.check_process_queue)
-            return
-
-        self.update_treeview(processes)
-        self.after(1000, self.update_process_list)
-
-    def update_treeview(self, processes):
-        current_items = {self.tree.item(child)['values'][0]: child for child in self.tree.get_children()}
-        new_items = {proc[0]: proc for proc in processes}
-
-        for pid in set(current_items) - set(new_items):
-            self.tree.delete(current_items[pid])
-
-        for pid, proc in new_items.items():
-            if pid in current_items:
-                self.tree.item(current_items[pid], values=proc)
-            else:
-                self.tree.insert("", tk.END, values=proc)
-
-    def search_process(self):
-        search_term = self.search_var.get()
-        self.update_process_list(search_term)
-
-    def debounce_search(self, *args):
-        self.after_cancel(self.after_id) if hasattr(self, 'after_id') else None
-        self.after_id = self.after(300, self.search_process)
-
-    def reset_search(self):
-        self.search_var.set("")
-        self.update_process_list()
-
-    def terminate_process(self):
-        selected_item = self.tree.selection()
-        if not selected_item:
-            messagebox.showwarning("Warning", "Please select a process to terminate")
-            return
-
-        pid = self.tree.item(selected_item[0], 'values')[0]
-        try:
-            p = psutil.Process(int(pid))
-            p.terminate()
-            p.wait(timeout=3)
-            messagebox.showinfo("Success", f"Process {pid} terminated successfully")
-            self.update_process_list()
-        except psutil.NoSuchProcess:
-            messagebox.showerror("Error", "No such process found")
-        except psutil.AccessDenied:
-            messagebox.showerror("Error", "Access denied")
-        except psutil.TimeoutExpired:
-            messagebox.showerror("Error", "Timeout expired while terminating process")
-
-    def create_process(self):
-        file_path = filedialog.askopenfilename(title="Select Script or Executable")
-        if file_path:
-            try:
-                subprocess.Popen([file_path])
-                messagebox.showinfo("Success", f"Process {file_path} started successfully")
-                self.update_process_list()
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to start process: {e}")
-
-if __name__ == "__main__":
-    app = TaskManagerApp()
-    app.mainloop()
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import os
+import subprocess
+import numpy as np
+from collector import make_collector, make_system_collector, require_psutil
+from history import History, SeriesRing
+from metrics import Metrics, SelfUsage
+from processtree import ProcessTree
+from proctable import ProcessTable
+from recorder import Recorder
+from sampler import Sampler
+from search import SearchIndex
+from terminate import TerminateJob
+from treeindex import TreeIndex
+from virtuallist import VirtualList
+
+TOP_N = 20
+PERFORMANCE_POINTS = 60
+# Seconds between the quick first scan and the first full sample
+WARM_UP = 0.5
+# Seconds to wait for terminated processes, per signal
+TERMINATE_TIMEOUT = 3.0
+# View name -> (collector.top, layout)
+VIEWS = {"All processes": (None, "list"), f"Top {TOP_N} CPU": ((TOP_N, "cpu"), "list"),
+         f"Top {TOP_N} memory": ((TOP_N, "memory"), "list"), "Process tree": (None, "tree")}
+
+
+class TaskManagerApp(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("Task Manager")
+        self.geometry("800x600")
+        # TASK_MANAGER_METRICS=1 starts with phase timing on
+        self.metrics = Metrics(enabled=os.environ.get("TASK_MANAGER_METRICS") == "1")
+        self.self_usage = SelfUsage()
+        self.create_widgets()
+        self.collector = make_collector()
+        self.history = History()
+        self.tree_index = TreeIndex(self.tree, self.columns, self.fields, self.empty_table(), self.metrics)
+        self.process_tree = ProcessTree(self.tree, self.fields, self.empty_table())
+        self.layout = "list"
+        self.snapshot = self.empty_table()
+        self.snapshot_generation = 0
+        self.search_index = SearchIndex(self.collector.names)
+        self.sort = None
+        self.recorder = None
+        self.sampler = Sampler(self.collector, delay=WARM_UP, metrics=self.metrics)
+        self.search_var.trace("w", self.debounce_search)
+        self.protocol("WM_DELETE_WINDOW", self.on_close)
+        self.bind("<Unmap>", self.on_map_change)
+        self.bind("<Map>", self.on_map_change)
+        # The first list comes from a scan without per-process details, so it is
+        # on screen before the sampler's first full sample has finished
+        self.consume_snapshot(self.collector.snapshot(details=False))
+        self.sampler.start()
+        self.check_snapshot()
+        self.update_status()
+
+    def create_widgets(self):
+        # Status bar: the app's own usage, and phase timings when they are on
+        status_frame = tk.Frame(self)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_var = tk.StringVar()
+        tk.Label(status_frame, textvariable=self.status_var, anchor=tk.W).pack(side=tk.LEFT, fill=tk.X, expand=True)
+        tk.Button(status_frame, text="Export Metrics", command=self.export_metrics).pack(side=tk.RIGHT, padx=5)
+        self.metrics_var = tk.BooleanVar(value=self.metrics.enabled)
+        tk.Checkbutton(status_frame, text="Timings", variable=self.metrics_var,
+                       command=self.toggle_metrics).pack(side=tk.RIGHT)
+
+        # Create a notebook
+        self.notebook = ttk.Notebook(self)
+        self.notebook.pack(fill=tk.BOTH, expand=True)
+
+        # Create a frame for the Processes tab
+        self.processes_frame = tk.Frame(self.notebook)
+        self.notebook.add(self.processes_frame, text="Processes")
+
+        # Create a frame for the Performance tab
+        self.performance_frame = tk.Frame(self.notebook)
+        self.notebook.add(self.performance_frame, text="Performance")
+
+        # Add content to Processes tab
+        self.create_processes_tab()
+
+        # The Performance tab is built on first view, which keeps matplotlib off the
+        # startup path
+        self.performance_built = False
+        self.performance_job = None
+        self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
+
+    def create_processes_tab(self):
+        search_frame = tk.Frame(self.processes_frame)
+        search_frame.pack(pady=10)
+
+        tk.Label(search_frame, text="Search:").pack(side=tk.LEFT, padx=5)
+        self.search_var = tk.StringVar()
+        self.search_entry = tk.Entry(search_frame, textvariable=self.search_var, width=30)
+        self.search_entry.pack(side=tk.LEFT, padx=5)
+        self.search_background = self.search_entry.cget("background")
+
+        search_button = tk.Button(search_frame, text="Search", command=self.search_process)
+        search_button.pack(side=tk.LEFT, padx=5)
+
+        reset_button = tk.Button(search_frame, text="Reset", command=self.reset_search)
+        reset_button.pack(side=tk.LEFT, padx=5)
+
+        self.virtual_var = tk.BooleanVar(value=False)
+        virtual_check = tk.Checkbutton(search_frame, text="Virtual list", variable=self.virtual_var,
+                                       command=self.toggle_virtual_list)
+        virtual_check.pack(side=tk.LEFT, padx=5)
+
+        self.record_var = tk.BooleanVar(value=False)
+        record_check = tk.Checkbutton(search_frame, text="Record", variable=self.record_var,
+                                      command=self.toggle_recording)
+        record_check.pack(side=tk.LEFT, padx=5)
+
+        tk.Label(search_frame, text="View:").pack(side=tk.LEFT, padx=5)
+        self.view_var = tk.StringVar(value=next(iter(VIEWS)))
+        view_box = ttk.Combobox(search_frame, textvariable=self.view_var, values=list(VIEWS),
+                                state="readonly", width=16)
+        view_box.bind("<<ComboboxSelected>>", self.change_view)
+        view_box.pack(side=tk.LEFT, padx=5)
+
+        tree_frame = tk.Frame(self.processes_frame)
+        tree_frame.pack(fill=tk.BOTH, expand=True)
+
+        columns = ("pid", "name", "cpu (%)", "history", "cpu 1m", "cpu 5m", "memory (MB)", "user", "command")
+        self.columns = columns
+        self.fields = ("pid", "name", "cpu", "history", "cpu_1m", "cpu_5m", "memory", "user", "cmdline")
+        self.column_keys = dict(zip(columns, self.fields))
+        self.tree = ttk.Treeview(tree_frame, columns=columns, show='headings')
+        self.tree.column("#0", width=80, stretch=False)
+        self.scrollbar = ttk.Scrollbar(tree_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+
+        for col in columns:
+            self.tree.heading(col, text=col.capitalize(), command=lambda c=col: self.sort_by_column(c, False))
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.virtual_list = VirtualList(self.tree, self.scrollbar, self.fields)
+
+        # Applies to every selected row
+        action_frame = tk.Frame(self.processes_frame)
+        action_frame.pack(pady=10)
+        self.terminate_button = tk.Button(action_frame, text="Terminate Process",
+                                          command=self.terminate_process)
+        self.terminate_button.pack(side=tk.LEFT, padx=5)
+        self.kill_button = tk.Button(action_frame, text="Kill Process",
+                                     command=lambda: self.terminate_process(kill=True))
+        self.kill_button.pack(side=tk.LEFT, padx=5)
+        self.tree_kill_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(action_frame, text="Include children", variable=self.tree_kill_var).pack(side=tk.LEFT, padx=5)
+        self.escalate_var = tk.BooleanVar(value=True)
+        tk.Checkbutton(action_frame, text=f"Kill if still running after {TERMINATE_TIMEOUT:g} s",
+                       variable=self.escalate_var).pack(side=tk.LEFT, padx=5)
+
+        self.create_button = tk.Button(self.processes_frame, text="Create Process", command=self.create_process)
+        self.create_button.pack(pady=10)
+
+    # noinspection PyTypeChecker
+    def create_performance_tab(self):
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        from matplotlib.ticker import MaxNLocator
+
+        self.system_collector = make_system_collector()
+        cores = len(self.system_collector.sample().cores)
+
+        # Rings hold every sample twice, so each frame plots contiguous views and
+        # never copies or allocates sample arrays
+        n = PERFORMANCE_POINTS
+        self.cpu_ring = SeriesRing(n)
+        self.core_ring = SeriesRing(n, cores)
+        self.memory_ring = SeriesRing(n)
+        self.disk_ring = SeriesRing(n, 2)
+        self.net_ring = SeriesRing(n, 2)
+        time_axis = np.arange(-n + 1, 1)
+
+        self.fig = Figure(figsize=(8, 6))
+        grid = self.fig.add_gridspec(3, 2)
+        self.ax_cpu = self.fig.add_subplot(grid[0, 0])
+        self.ax_cores = self.fig.add_subplot(grid[0, 1])
+        self.ax_memory = self.fig.add_subplot(grid[1, 0])
+        self.ax_disk = self.fig.add_subplot(grid[1, 1])
+        self.ax_net = self.fig.add_subplot(grid[2, :])
+
+        self.ax_cpu.set_title('CPU Usage (%)')
+        self.ax_cpu.set_ylim(0, 100)
+        self.ax_cores.set_title('Per-core CPU (%)')
+        self.ax_cores.set_ylabel('Core')
+        self.ax_cores.yaxis.set_major_locator(MaxNLocator(integer=True))
+        self.ax_memory.set_title('Memory Usage (MB)')
+        self.ax_memory.set_ylim(0, self.system_collector.memory_total)
+        self.ax_disk.set_title('Disk I/O (MB/s)')
+        self.ax_disk.set_ylim(0, 1)
+        self.ax_net.set_title('Network (MB/s)')
+        self.ax_net.set_ylim(0, 1)
+        self.ax_net.set_xlabel('Time (s)')
+        for ax in (self.ax_cpu, self.ax_memory, self.ax_disk, self.ax_net):
+            ax.set_xlim(-n + 1, 0)
+
+        # Only the data artists are animated; axes, ticks and labels live in the
+        # cached background. 128 cores are one image, not 128 lines.
+        self.cpu_line, = self.ax_cpu.plot(time_axis, self.cpu_ring.window()[0], animated=True)
+        self.core_image = self.ax_cores.imshow(self.core_ring.window(), aspect='auto', origin='lower',
+                                               interpolation='nearest', vmin=0, vmax=100, animated=True,
+                                               extent=(-n + 0.5, 0.5, -0.5, cores - 0.5))
+        self.memory_line, = self.ax_memory.plot(time_axis, self.memory_ring.window()[0], animated=True)
+        self.disk_lines = self.ax_disk.plot(time_axis, self.disk_ring.window().T, animated=True)
+        self.ax_disk.legend(self.disk_lines, ('read', 'write'), loc='upper left')
+        self.net_lines = self.ax_net.plot(time_axis, self.net_ring.window().T, animated=True)
+        self.ax_net.legend(self.net_lines, ('received', 'sent'), loc='upper left')
+        self.fig.tight_layout(pad=1.0)
+
+        self.performance_artists = (
+            (self.ax_cpu, (self.cpu_line,)),
+            (self.ax_cores, (self.core_image,)),
+            (self.ax_memory, (self.memory_line,)),
+            (self.ax_disk, self.disk_lines),
+            (self.ax_net, self.net_lines),
+        )
+
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.performance_frame)
+        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        self.canvas.mpl_connect('draw_event', self.on_performance_draw)
+        self.performance_background = None
+        self.performance_built = True
+
+    def on_performance_draw(self, event):
+        # A full draw (first map, resize, rescale) refreshes the static background
+        self.performance_background = self.canvas.copy_from_bbox(self.fig.bbox)
+        self.blit_performance_artists()
+
+    def blit_performance_artists(self):
+        if self.performance_background is None:
+            return
+        self.canvas.restore_region(self.performance_background)
+        for ax, artists in self.performance_artists:
+            for artist in artists:
+                ax.draw_artist(artist)
+            self.canvas.blit(ax.bbox)
+
+    def on_tab_changed(self, event):
+        # Sampling and drawing only run while the Performance tab is visible
+        visible = self.notebook.select() == str(self.performance_frame)
+        if visible and not self.performance_built:
+            self.create_performance_tab()
+        if visible and self.performance_job is None:
+            self.update_performance_graphs()
+        elif not visible and self.performance_job is not None:
+            self.after_cancel(self.performance_job)
+            self.performance_job = None
+
+    def fit_throughput(self, ax, ring):
+        # Throughput has no natural ceiling: rescale in powers of two, and only
+        # when the data leaves the current range, since that needs a full draw
+        peak = ring.peak()
+        top = ax.get_ylim()[1]
+        if peak <= top and (peak >= top / 8 or top <= 1):
+            return False
+        ax.set_ylim(0, max(1, 2 ** np.ceil(np.log2(max(peak, 1e-9) * 1.25))))
+        return True
+
+    def update_performance_graphs(self):
+        # One batched sample feeds every pane
+        sample = self.system_collector.sample()
+        self.cpu_ring.push(sample.cpu)
+        if len(sample.cores) == self.core_ring.data.shape[0]:
+            self.core_ring.push(sample.cores)
+        self.memory_ring.push(sample.memory_used)
+        self.disk_ring.push((sample.disk_read, sample.disk_write))
+        self.net_ring.push((sample.net_rx, sample.net_tx))
+
+        self.cpu_line.set_ydata(self.cpu_ring.window()[0])
+        self.core_image.set_data(self.core_ring.window())
+        self.memory_line.set_ydata(self.memory_ring.window()[0])
+        for line, values in zip(self.disk_lines, self.disk_ring.window()):
+            line.set_ydata(values)
+        for line, values in zip(self.net_lines, self.net_ring.window()):
+            line.set_ydata(values)
+
+        rescaled = self.fit_throughput(self.ax_disk, self.disk_ring)
+        rescaled = self.fit_throughput(self.ax_net, self.net_ring) or rescaled
+        if rescaled:
+            self.canvas.draw_idle()
+        else:
+            self.blit_performance_artists()
+        self.performance_job = self.after(1000, self.update_performance_graphs)
+
+    def sort_by_column(self, col, reverse):
+        # The sort lives in the model and is re-applied to every new snapshot
+        self.sort = (self.column_keys[col], reverse)
+        for c in self.columns:
+            self.tree.heading(c, text=c.capitalize())
+        self.tree.heading(col, text=col.capitalize() + (" \u25bc" if reverse else " \u25b2"),
+                          command=lambda: self.sort_by_column(col, not reverse))
+        self.update_process_list()
+
+    def check_snapshot(self):
+        # The only consumer loop: pick up the sampler's latest snapshot, if any
+        generation, snapshot = self.sampler.latest()
+        if generation != self.snapshot_generation:
+            self.snapshot_generation = generation
+            self.metrics.record("handoff", self.sampler.published)
+            self.consume_snapshot(snapshot)
+        self.after(100, self.check_snapshot)
+
+    def consume_snapshot(self, snapshot):
+        started = self.metrics.mark()
+        self.history.update(snapshot)
+        self.snapshot = self.history.annotate(snapshot)
+        self.search_index.update(self.snapshot)
+        self.metrics.record("annotate", started)
+        self.update_process_list()
+
+    def update_process_list(self):
+        started = self.metrics.mark()
+        try:
+            processes = self.search_index.search(self.search_var.get())
+            self.search_entry.configure(background=self.search_background)
+        except ValueError:
+            processes = self.snapshot
+            self.search_entry.configure(background="misty rose")
+        self.metrics.record("filter", started)
+        sort = self.current_sort()
+        if self.layout == "tree":
+            started = self.metrics.mark()
+            self.process_tree.update(processes, sort)
+            self.metrics.record("render", started)
+        elif self.virtual_var.get():
+            started = self.metrics.mark()
+            if sort is not None:
+                processes = processes.sorted(*sort)
+            self.virtual_list.set_table(processes)
+            self.metrics.record("render", started)
+        else:
+            # TreeIndex times its own diff and render phases
+            self.update_treeview(processes)
+
+    def update_treeview(self, processes):
+        self.tree_index.update(processes, self.current_sort())
+
+    def current_sort(self):
+        # Top-N views rank by their column unless the user picked another sort
+        top = self.collector.top
+        if self.sort is None and top is not None:
+            return (top[1], True)
+        return self.sort
+
+    def change_view(self, event=None):
+        top, layout = VIEWS[self.view_var.get()]
+        self.collector.top = top
+        if layout != self.layout:
+            self.set_layout(layout)
+        self.sampler.refresh()
+
+    def set_layout(self, layout):
+        if self.layout == "list" and self.virtual_var.get():
+            self.virtual_list.detach()
+        self.layout = layout
+        self.reset_treeview()
+        self.tree.configure(show="tree headings" if layout == "tree" else "headings")
+        if layout == "list" and self.virtual_var.get():
+            self.virtual_list.attach()
+        self.update_process_list()
+
+    def empty_table(self):
+        return self.history.annotate(ProcessTable.empty(self.collector.names))
+
+    def reset_treeview(self):
+        self.tree.delete(*self.tree.get_children())
+        self.tree_index.clear(self.empty_table())
+        self.process_tree.clear(self.empty_table())
+
+    def toggle_virtual_list(self):
+        if self.layout != "list":
+            # Applied when the view returns to a flat list
+            return
+        if self.virtual_var.get():
+            table = self.tree_index.table
+            self.reset_treeview()
+            self.virtual_list.attach()
+            self.virtual_list.set_table(table)
+        else:
+            table = self.virtual_list.table
+            self.virtual_list.detach()
+            self.reset_treeview()
+            if table is not None:
+                self.update_treeview(table)
+
+    def update_status(self):
+        cpu, rss = self.self_usage.sample()
+        status = f"Task manager: cpu {cpu:.1f}%  rss {rss:.0f} MB  refresh {self.sampler.schedule.period():.1f} s"
+        summary = self.metrics.summary() if self.metrics.enabled else {}
+        if summary:
+            status += "    p50/p99 ms: " + "  ".join(f"{phase} {stats['p50_ms']:.1f}/{stats['p99_ms']:.1f}"
+                                                    for phase, stats in summary.items())
+            cache = self.collector.details
+            if cache.hits + cache.misses:
+                status += f"  cache {100 * cache.hits / (cache.hits + cache.misses):.0f}% hits, {len(cache)} entries"
+        self.status_var.set(status)
+        self.usage = (cpu, rss)
+        self.after(1000, self.update_status)
+
+    def on_map_change(self, event):
+        # Children's map events reach the toplevel binding too; only the window counts
+        if event.widget is not self:
+            return
+        hidden = str(event.type) == "Unmap"
+        self.sampler.schedule.hidden = hidden
+        if not hidden:
+            # Catch up at once instead of waiting out the long hidden period
+            self.sampler.refresh()
+
+    def toggle_metrics(self):
+        self.metrics.clear()
+        self.metrics.enabled = self.metrics_var.get()
+
+    def export_metrics(self):
+        path = filedialog.asksaveasfilename(title="Export Metrics", defaultextension=".json",
+                                            filetypes=[("JSON", "*.json"), ("Prometheus text", "*.prom")])
+        if path:
+            try:
+                self.metrics.export(path, self.usage, {"attribute_cache": self.collector.details.stats()})
+            except OSError as e:
+                messagebox.showerror("Error", f"Failed to export metrics: {e}")
+
+    def toggle_recording(self):
+        if self.record_var.get():
+            directory = filedialog.askdirectory(title="Select Recording Directory")
+            if not directory:
+                self.record_var.set(False)
+                return
+            try:
+                self.recorder = Recorder(directory)
+            except OSError as e:
+                self.record_var.set(False)
+                messagebox.showerror("Error", f"Failed to start recording: {e}")
+                return
+            self.sampler.add_sink(self.recorder.write)
+        else:
+            self.stop_recording()
+
+    def stop_recording(self):
+        if self.recorder is not None:
+            self.sampler.remove_sink(self.recorder.write)
+            self.recorder.close()
+            self.recorder = None
+
+    def search_process(self):
+        self.update_process_list()
+
+    def debounce_search(self, *args):
+        self.after_cancel(self.after_id) if hasattr(self, 'after_id') else None
+        self.after_id = self.after(300, self.search_process)
+
+    def reset_search(self):
+        self.search_var.set("")
+        self.update_process_list()
+
+    def terminate_process(self, kill=False):
+        selected_items = self.tree.selection()
+        if not selected_items:
+            messagebox.showwarning("Warning", "Please select a process to terminate")
+            return
+
+        pids = sorted({int(self.tree.item(item, 'values')[0]) for item in selected_items})
+        try:
+            require_psutil()
+        except RuntimeError as e:
+            messagebox.showerror("Error", str(e))
+            return
+        job = TerminateJob(pids, kill=kill, tree=self.tree_kill_var.get(), escalate=self.escalate_var.get(),
+                           timeout=TERMINATE_TIMEOUT)
+        job.start()
+        self.check_terminate(job)
+
+    def check_terminate(self, job):
+        # Polled like the sampler, so the waiting never blocks the UI
+        if job.is_alive():
+            self.after(100, self.check_terminate, job)
+            return
+        self.sampler.refresh()
+        self.show_summary("Kill" if job.kill else "Terminate", job.summary())
+
+    def show_summary(self, title, text):
+        # Non-modal: the process list keeps updating behind it
+        window = tk.Toplevel(self)
+        window.title(title)
+        window.transient(self)
+        tk.Message(window, text=text, width=480).pack(padx=10, pady=10)
+        tk.Button(window, text="Close", command=window.destroy).pack(pady=(0, 10))
+
+    def create_process(self):
+        file_path = filedialog.askopenfilename(title="Select Script or Executable")
+        if file_path:
+            try:
+                subprocess.Popen([file_path])
+                messagebox.showinfo("Success", f"Process {file_path} started successfully")
+                self.sampler.refresh()
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to start process: {e}")
+
+    def on_close(self):
+        self.sampler.stop()
+        self.stop_recording()
+        self.destroy()
+
+if __name__ == "__main__":
+    app = TaskManagerApp()
+    app.mainloop()
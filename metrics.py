@@ -0,0 +1,110 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+# Phases timed by the GUI, in pipeline order
+PHASES = ("collect", "handoff", "annotate", "filter", "diff", "render")
+PERCENTILES = (50, 90, 99)
+
+
+class Metrics:
+    # Rolling per-phase timings. Call sites bracket a phase with
+    #     started = metrics.mark()
+    #     ...
+    #     metrics.record("phase", started)
+    # which costs one attribute test each while timing is off.
+    def __init__(self, window=256, enabled=False):
+        self.window = window
+        self.enabled = enabled
+        # phase -> [durations ring, samples recorded]
+        self.rings = {}
+
+    def mark(self):
+        return time.perf_counter() if self.enabled else 0.0
+
+    def record(self, phase, started):
+        if not (self.enabled and started):
+            return
+        ring = self.rings.get(phase)
+        if ring is None:
+            ring = self.rings[phase] = [np.zeros(self.window), 0]
+        # One writer per phase, so the ring needs no lock
+        ring[0][ring[1] % self.window] = time.perf_counter() - started
+        ring[1] += 1
+
+    def clear(self):
+        self.rings = {}
+
+    def summary(self):
+        # {phase: {"count", "p50_ms", "p90_ms", "p99_ms", "max_ms"}} over the window
+        result = {}
+        rings = dict(self.rings)
+        order = [phase for phase in PHASES if phase in rings] + [phase for phase in rings if phase not in PHASES]
+        for phase in order:
+            samples, count = rings[phase]
+            if not count:
+                continue
+            recent = samples[:min(count, self.window)] * 1000
+            stats = {"count": count}
+            for q, value in zip(PERCENTILES, np.percentile(recent, PERCENTILES)):
+                stats[f"p{q}_ms"] = float(value)
+            stats["max_ms"] = float(recent.max())
+            result[phase] = stats
+        return result
+
+    def export(self, path, usage=None, counters=None):
+        # JSON, or the Prometheus text format when the file name ends in .prom.
+        # counters: {"group": {"name": value}}, e.g. the attribute cache's stats
+        summary = self.summary()
+        if path.endswith(".prom"):
+            lines = ["# TYPE task_manager_phase_seconds summary"]
+            for phase, stats in summary.items():
+                for q in PERCENTILES:
+                    lines.append(f'task_manager_phase_seconds{{phase="{phase}",quantile="{q / 100}"}} '
+                                 f'{stats[f"p{q}_ms"] / 1000:.6f}')
+                lines.append(f'task_manager_phase_seconds_count{{phase="{phase}"}} {stats["count"]}')
+            if usage is not None:
+                lines.append(f"task_manager_cpu_percent {usage[0]:.2f}")
+                lines.append(f"task_manager_rss_bytes {int(usage[1] * 1024 * 1024)}")
+            for group, values in (counters or {}).items():
+                for name, value in values.items():
+                    lines.append(f"task_manager_{group}_{name} {value}")
+            text = "\n".join(lines) + "\n"
+        else:
+            document = {"time": time.time(), "phases": summary}
+            if usage is not None:
+                document["cpu_percent"], document["rss_mb"] = usage
+            if counters:
+                document["counters"] = counters
+            text = json.dumps(document, indent=2) + "\n"
+        with open(path, "w") as f:
+            f.write(text)
+
+
+class SelfUsage:
+    # The task manager's own cpu% since the previous call and current rss in MB
+    def __init__(self):
+        self.prev = None
+        self.page_mb = os.sysconf("SC_PAGE_SIZE") / (1024 * 1024) if hasattr(os, "sysconf") else 0.0
+
+    def rss(self):
+        try:
+            with open("/proc/self/statm", "rb") as f:
+                return int(f.read().split()[1]) * self.page_mb
+        except OSError:
+            # Peak rather than current, but the best without /proc
+            import resource
+            peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+    def sample(self):
+        times = os.times()
+        now = (time.monotonic(), times.user + times.system)
+        cpu = 0.0
+        if self.prev is not None and now[0] > self.prev[0]:
+            cpu = 100.0 * (now[1] - self.prev[1]) / (now[0] - self.prev[0])
+        self.prev = now
+        return cpu, self.rss()
@@ -0,0 +1,162 @@
+import itertools
+import tkinter as tk
+
+import numpy as np
+
+from proctable import ProcessTable
+
+# Deeper chains only come from a torn /proc read that linked a cycle through a reused pid
+MAX_DEPTH = 256
+
+
+def parent_rows(table):
+    # Row of each process's parent in the same table, -1 when the parent is not in it
+    order = np.argsort(table.pid, kind="stable")
+    pids = table.pid[order]
+    at = np.minimum(np.searchsorted(pids, table.ppid), max(len(pids) - 1, 0))
+    found = (pids[at] == table.ppid) & (table.ppid != table.pid)
+    return np.where(found, order[at], -1)
+
+
+def parent_items(items, parents):
+    # Item id of each row's parent, "" for top-level rows
+    result = np.full(len(parents), "", dtype=object)
+    inner = parents >= 0
+    result[inner] = items[parents[inner]]
+    return result
+
+
+def depth_levels(parents):
+    # Rows grouped by depth, top-level rows first. Cycles are cut in place.
+    depth = np.zeros(len(parents), dtype=np.int64)
+    up = parents.copy()
+    for _ in range(MAX_DEPTH):
+        inner = np.flatnonzero(up >= 0)
+        if not len(inner):
+            break
+        depth[inner] += 1
+        up[inner] = parents[up[inner]]
+    else:
+        parents[np.unique(up[up >= 0])] = -1
+        return depth_levels(parents)
+    order = np.argsort(depth, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(depth))[:-1]) if len(depth) else [order]
+
+
+class ProcessTree:
+    # Hierarchical counterpart of TreeIndex: each process is an item under its
+    # parent's item. Snapshots are applied as diffs, so only spawned, exited and
+    # re-parented processes touch the structure. The cpu and memory cells show
+    # subtree totals, and values are only pushed to rows that can be seen, so
+    # collapsed subtrees (the default) cost nothing to render.
+    def __init__(self, tree, fields, table):
+        self.tree = tree
+        self.fields = fields
+        self.sort = None
+        self.clear(table)
+        self.tree.bind("<<TreeviewOpen>>", lambda e: self.on_toggle(True), add="+")
+        self.tree.bind("<<TreeviewClose>>", lambda e: self.on_toggle(False), add="+")
+
+    def clear(self, table):
+        self.table = table
+        self.items = np.empty(0, dtype=object)
+        self.shown = np.empty(0, dtype=object)
+        self.opened = np.zeros(0, dtype=bool)
+        self.parents = np.empty(0, dtype=np.int64)
+        self.levels = [np.empty(0, dtype=np.int64)]
+        self.totals = np.zeros((0, 2))
+
+    def __len__(self):
+        return len(self.table)
+
+    def update(self, table, sort=None):
+        added, removed, new_index, old_index = table.diff(self.table)
+        items = np.empty(len(table), dtype=object)
+        items[new_index] = self.items[old_index]
+        shown = np.empty(len(table), dtype=object)
+        shown[new_index] = self.shown[old_index]
+        opened = np.zeros(len(table), dtype=bool)
+        opened[new_index] = self.opened[old_index]
+        parents = parent_rows(table)
+        levels = depth_levels(parents)
+        depth = np.empty(len(table), dtype=np.int64)
+        for level, rows in enumerate(levels):
+            depth[rows] = level
+
+        # A survivor moves when its parent changed; a parent that is itself new has
+        # no item yet, which also counts as a change
+        was = parent_items(self.items, self.parents)[old_index]
+        moved = new_index[parent_items(items, parents)[new_index] != was]
+
+        # Parents are placed before their children, so every target item exists
+        placing = np.concatenate((added, moved))
+        placing = placing[np.argsort(depth[placing], kind="stable")]
+        for row, parent in zip(placing.tolist(), parents[placing].tolist()):
+            parent = items[parent] if parent >= 0 else ""
+            if items[row] is None:
+                items[row] = self.tree.insert(parent, tk.END)
+            else:
+                self.tree.move(items[row], parent, tk.END)
+
+        # Deleting an item takes its descendants along, and survivors have been moved
+        # out by now, so only the topmost removed items need naming
+        if len(removed):
+            gone = np.zeros(len(self.table) + 1, dtype=bool)
+            gone[removed] = True
+            self.tree.delete(*self.items[removed[~gone[self.parents[removed]]]])
+
+        self.table = table
+        self.items = items
+        self.shown = shown
+        self.opened = opened
+        self.parents = parents
+        self.levels = levels
+        self.totals = np.column_stack((table.cpu, table.memory))
+        for rows in reversed(levels[1:]):
+            np.add.at(self.totals, parents[rows], self.totals[rows])
+        self.sort = sort
+        self.refresh()
+        return len(added) + len(removed) + len(moved)
+
+    def visible_rows(self):
+        visible = self.parents < 0
+        for rows in self.levels[1:]:
+            up = self.parents[rows]
+            visible[rows] = visible[up] & self.opened[up]
+        return np.flatnonzero(visible)
+
+    def refresh(self):
+        table = self.table
+        visible = self.visible_rows()
+        rolled = ProcessTable(table.names, dict(table.columns, cpu=self.totals[:, 0], memory=self.totals[:, 1]))
+        rolled = rolled.take(visible)
+        for row, values in zip(visible.tolist(), rolled.display_rows(self.fields)):
+            if self.shown[row] != values:
+                self.tree.item(self.items[row], values=values)
+                self.shown[row] = values
+        self.order_children(visible, rolled)
+
+    def order_children(self, visible, rolled):
+        # Every child of a visible open item is visible, so sorting the visible rows
+        # by (parent, rank) yields the complete sibling order of each open item
+        if self.sort is None:
+            order = np.argsort(rolled.key, kind="stable")
+        else:
+            order = rolled.argsort(*self.sort)
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+        order = np.lexsort((rank, self.parents[visible]))
+        rows = visible[order]
+        for parent, group in itertools.groupby(zip(parent_items(self.items, self.parents[rows]).tolist(),
+                                                   self.items[rows].tolist()), key=lambda pair: pair[0]):
+            children = tuple(iid for _, iid in group)
+            if self.tree.get_children(parent) != children:
+                self.tree.set_children(parent, *children)
+
+    def on_toggle(self, opened):
+        # Fired for the focus item just before Tk opens or closes it
+        row = np.flatnonzero(self.items == self.tree.focus())
+        if len(row):
+            self.opened[row] = opened
+            if opened:
+                self.refresh()
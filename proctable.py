@@ -0,0 +1,157 @@
+import sys
+from array import array
+
+import numpy as np
+
+# pid_max on Linux is at most 2**22, so (start, pid) packs into one int64 key
+PID_BITS = 22
+# cpu and memory are shown with one decimal; finer changes are not worth a redraw
+DISPLAY_DIGITS = 1
+
+
+class NameTable:
+    # Interns process names into small integer codes shared by every snapshot,
+    # so a table stores one int32 per row instead of one str object per row.
+    def __init__(self):
+        self.codes = {}
+        self.names = []
+        self.lower = []
+        self.cached_ranks = np.empty(0, dtype=np.int64)
+
+    def code(self, name):
+        code = self.codes.get(name)
+        if code is None:
+            code = len(self.names)
+            name = sys.intern(name)
+            self.codes[name] = code
+            self.names.append(name)
+            self.lower.append(name.lower())
+        return code
+
+    def ranks(self):
+        # Position of every code in case-insensitive name order. Codes are only ever
+        # appended, so the cache is current as long as its length still matches.
+        lower = self.lower[:]
+        if len(self.cached_ranks) != len(lower):
+            order = sorted(range(len(lower)), key=lower.__getitem__)
+            ranks = np.empty(len(order), dtype=np.int64)
+            ranks[order] = np.arange(len(order))
+            self.cached_ranks = ranks
+        return self.cached_ranks
+
+
+# Typecodes of the numeric columns; "name" and "user" hold NameTable codes
+SCHEMA = {"pid": "q", "start": "q", "name": "i", "cpu": "d", "memory": "d", "user": "i", "ppid": "q"}
+CODED = ("name", "user")
+DTYPES = {"q": np.int64, "i": np.int32, "d": np.float64}
+COLUMNS = ("pid", "name", "cpu", "memory", "user", "cmdline")
+
+
+class TableBuilder:
+    def __init__(self, names):
+        self.names = names
+        self.columns = {column: array(code) for column, code in SCHEMA.items()}
+        self.cmdline = []
+
+    def append(self, pid, start, name, cpu, memory, user="", cmdline="", ppid=0):
+        columns = self.columns
+        columns["pid"].append(pid)
+        columns["start"].append(start)
+        columns["name"].append(self.names.code(name))
+        columns["cpu"].append(cpu)
+        columns["memory"].append(memory)
+        columns["user"].append(self.names.code(user))
+        columns["ppid"].append(ppid)
+        self.cmdline.append(cmdline)
+
+    def build(self):
+        columns = {column: np.frombuffer(values, dtype=DTYPES[SCHEMA[column]])
+                   for column, values in self.columns.items()}
+        columns["cmdline"] = np.array(self.cmdline, dtype=object)
+        return ProcessTable(self.names, columns)
+
+
+class ProcessTable:
+    def __init__(self, names, columns):
+        self.names = names
+        self.columns = columns
+
+    def __getattr__(self, column):
+        try:
+            return self.__dict__["columns"][column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    @classmethod
+    def empty(cls, names):
+        return TableBuilder(names).build()
+
+    def __len__(self):
+        return len(self.pid)
+
+    @property
+    def key(self):
+        return (self.start << PID_BITS) | self.pid
+
+    def take(self, index):
+        return ProcessTable(self.names, {column: values[index] for column, values in self.columns.items()})
+
+    def filter(self, mask):
+        return self.take(np.flatnonzero(mask))
+
+    def compare_values(self, column):
+        # What a cell shows, in a form that compares with == across tables
+        values = self.columns[column]
+        if values.dtype.kind == "f":
+            return values.round(DISPLAY_DIGITS)
+        return values
+
+    def sort_values(self, column):
+        # Typed sort key; floats compare at display precision so sub-digit jitter
+        # does not reorder rows that look identical
+        if column in CODED:
+            return self.names.ranks()[self.columns[column]]
+        if column == "cmdline":
+            return np.unique(self.cmdline, return_inverse=True)[1].reshape(-1)
+        return self.compare_values(column)
+
+    def argsort(self, column, reverse=False):
+        order = np.argsort(self.sort_values(column), kind="stable")
+        return order[::-1] if reverse else order
+
+    def sorted(self, column, reverse=False):
+        return self.take(self.argsort(column, reverse))
+
+    def display_column(self, column):
+        if column in CODED:
+            names = self.names.names
+            return [names[code] for code in self.columns[column].tolist()]
+        return self.compare_values(column).tolist()
+
+    def export_column(self, column):
+        # Plain Python values at full precision, names decoded
+        if column in CODED:
+            names = self.names.names
+            return [names[code] for code in self.columns[column].tolist()]
+        return self.columns[column].tolist()
+
+    def records(self, columns=COLUMNS):
+        return [dict(zip(columns, row)) for row in zip(*(self.export_column(column) for column in columns))]
+
+    def rows(self):
+        names = self.names.names
+        return zip(self.pid.tolist(), [names[code] for code in self.name.tolist()],
+                   self.cpu.tolist(), self.memory.tolist())
+
+    def display_rows(self, columns=COLUMNS):
+        return zip(*(self.display_column(column) for column in columns))
+
+    def diff(self, prev):
+        # Returns (added, removed, new_index, old_index): rows only in self, rows only
+        # in prev, and the aligned positions of rows present in both.
+        _, new_index, old_index = np.intersect1d(self.key, prev.key, assume_unique=True, return_indices=True)
+        added = np.ones(len(self), dtype=bool)
+        added[new_index] = False
+        removed = np.ones(len(prev), dtype=bool)
+        removed[old_index] = False
+        return np.flatnonzero(added), np.flatnonzero(removed), new_index, old_index
@@ -0,0 +1,322 @@
+import argparse
+import bisect
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from collector import make_collector
+from proctable import NameTable, ProcessTable
+
+# A segment is a sequence of records, each a fixed header followed by a zlib
+# compressed payload. Keyframes hold the whole table; deltas hold removed keys,
+# added rows and rows whose values changed since the previous record. Strings
+# (names, users, command lines) are numbered from each keyframe on and every
+# record carries the strings it introduces, so decoding can start at any keyframe.
+RECORD = struct.Struct("<BdII")  # kind, wall time, payload length, crc32
+INDEX = struct.Struct("<dQ")  # wall time, offset of a keyframe in its segment
+COUNT = struct.Struct("<I")
+KEYFRAME = 0
+DELTA = 1
+
+ROW_DTYPES = (("pid", np.int32), ("start", np.int64), ("name", np.uint32), ("user", np.uint32),
+              ("cmdline", np.uint32), ("cpu", np.float32), ("memory", np.float32), ("ppid", np.int32))
+CHANGE_DTYPES = (("key", np.int64), ("name", np.uint32), ("cpu", np.float32), ("memory", np.float32),
+                 ("ppid", np.int32))
+
+
+def pack_arrays(parts, arrays, dtypes):
+    parts.append(COUNT.pack(len(arrays[0])))
+    for (_, dtype), values in zip(dtypes, arrays):
+        parts.append(np.ascontiguousarray(values, dtype=dtype).tobytes())
+
+
+def unpack_arrays(payload, offset, dtypes):
+    count, = COUNT.unpack_from(payload, offset)
+    offset += COUNT.size
+    arrays = {}
+    for column, dtype in dtypes:
+        arrays[column] = np.frombuffer(payload, dtype=dtype, count=count, offset=offset)
+        offset += count * np.dtype(dtype).itemsize
+    return arrays, offset
+
+
+class Recorder:
+    # Appends snapshots to DIR/<sequence>.rec, with a keyframe index in the
+    # matching .idx file. Segments roll over at segment_bytes and the oldest are
+    # deleted once the directory holds more than max_bytes.
+    def __init__(self, directory, segment_bytes=64 << 20, max_bytes=1 << 30, keyframe_every=60):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.max_bytes = max_bytes
+        self.keyframe_every = keyframe_every
+        os.makedirs(directory, exist_ok=True)
+        segments = list_segments(directory)
+        self.sequence = segments[-1][0] + 1 if segments else 0
+        self.segment = None
+        self.index = None
+
+    def open_segment(self):
+        base = os.path.join(self.directory, f"{self.sequence:08d}")
+        self.segment = open(base + ".rec", "ab")
+        self.index = open(base + ".idx", "ab")
+        self.sequence += 1
+        self.prev = None
+        self.since_keyframe = 0
+        self.enforce_cap()
+
+    def close(self):
+        if self.segment is not None:
+            self.segment.close()
+            self.index.close()
+            self.segment = None
+
+    def enforce_cap(self):
+        segments = list_segments(self.directory)
+        total = sum(size for _, _, size in segments)
+        for _, base, size in segments[:-1]:
+            if total <= self.max_bytes:
+                break
+            for suffix in (".rec", ".idx"):
+                try:
+                    os.remove(base + suffix)
+                except OSError:
+                    pass
+            total -= size
+
+    def string_codes(self, table, column, rows, new_strings):
+        if column == "cmdline":
+            values = table.cmdline[rows].tolist()
+        else:
+            names = table.names.names
+            values = [names[code] for code in table.columns[column][rows].tolist()]
+        codes = []
+        for value in values:
+            code = self.strings.get(value)
+            if code is None:
+                code = self.strings[value] = len(self.strings)
+                new_strings.append(value)
+            codes.append(code)
+        return codes
+
+    def row_arrays(self, table, rows, new_strings):
+        return [table.pid[rows], table.start[rows],
+                self.string_codes(table, "name", rows, new_strings),
+                self.string_codes(table, "user", rows, new_strings),
+                self.string_codes(table, "cmdline", rows, new_strings),
+                table.cpu[rows], table.memory[rows], table.ppid[rows]]
+
+    def write(self, table, now=None):
+        now = time.time() if now is None else now
+        if self.segment is None or self.segment.tell() >= self.segment_bytes:
+            self.close()
+            self.open_segment()
+
+        parts = []
+        new_strings = []
+        if self.prev is None or self.since_keyframe >= self.keyframe_every:
+            kind = KEYFRAME
+            self.strings = {}
+            pack_arrays(parts, self.row_arrays(table, slice(None), new_strings), ROW_DTYPES)
+            self.since_keyframe = 0
+        else:
+            kind = DELTA
+            prev = self.prev
+            added, removed, new_index, old_index = table.diff(prev)
+            # Stored precision is float32, so smaller moves are not worth a record
+            changed = ((table.cpu[new_index].astype(np.float32) != prev.cpu[old_index].astype(np.float32))
+                       | (table.memory[new_index].astype(np.float32) != prev.memory[old_index].astype(np.float32))
+                       | (table.name[new_index] != prev.name[old_index])
+                       | (table.ppid[new_index] != prev.ppid[old_index]))
+            changed = new_index[changed]
+            parts.append(COUNT.pack(len(removed)))
+            parts.append(prev.key[removed].tobytes())
+            pack_arrays(parts, self.row_arrays(table, added, new_strings), ROW_DTYPES)
+            pack_arrays(parts, [table.key[changed], self.string_codes(table, "name", changed, new_strings),
+                                table.cpu[changed], table.memory[changed], table.ppid[changed]], CHANGE_DTYPES)
+            self.since_keyframe += 1
+
+        blob = "\0".join(new_strings).encode("utf-8", "replace")
+        payload = zlib.compress(COUNT.pack(len(new_strings)) + COUNT.pack(len(blob)) + blob + b"".join(parts), 1)
+
+        offset = self.segment.tell()
+        self.segment.write(RECORD.pack(kind, now, len(payload), zlib.crc32(payload)) + payload)
+        self.segment.flush()
+        if kind == KEYFRAME:
+            self.index.write(INDEX.pack(now, offset))
+            self.index.flush()
+        self.prev = table
+
+
+def list_segments(directory):
+    # (sequence, path without suffix, bytes on disk) for every segment, oldest first
+    segments = []
+    for entry in os.listdir(directory):
+        stem, suffix = os.path.splitext(entry)
+        if suffix == ".rec" and stem.isdigit():
+            base = os.path.join(directory, stem)
+            size = os.path.getsize(base + ".rec")
+            if os.path.exists(base + ".idx"):
+                size += os.path.getsize(base + ".idx")
+            segments.append((int(stem), base, size))
+    return sorted(segments)
+
+
+class Replay:
+    # Rebuilds snapshots from a segment. Columns are kept sorted by key so that
+    # deltas apply with searchsorted instead of per-row lookups.
+    def __init__(self, names):
+        self.names = names
+        self.strings = []
+        self.columns = None
+
+    def decode_strings(self, payload):
+        count, size = struct.unpack_from("<II", payload)
+        if count:
+            self.strings.extend(payload[8:8 + size].decode("utf-8").split("\0"))
+        return 8 + size
+
+    def rows_to_columns(self, rows):
+        names = self.names
+        strings = self.strings
+        return {
+            "pid": rows["pid"].astype(np.int64),
+            "start": rows["start"],
+            "name": np.array([names.code(strings[code]) for code in rows["name"].tolist()], dtype=np.int32),
+            "user": np.array([names.code(strings[code]) for code in rows["user"].tolist()], dtype=np.int32),
+            "cmdline": np.array([strings[code] for code in rows["cmdline"].tolist()], dtype=object),
+            "cpu": rows["cpu"].astype(np.float64),
+            "memory": rows["memory"].astype(np.float64),
+            "ppid": rows["ppid"].astype(np.int64),
+        }
+
+    def apply(self, kind, payload):
+        if kind == KEYFRAME:
+            self.strings = []
+        offset = self.decode_strings(payload)
+        if kind == KEYFRAME:
+            rows, _ = unpack_arrays(payload, offset, ROW_DTYPES)
+            self.set_columns(self.rows_to_columns(rows))
+            return self.table()
+        if self.columns is None:
+            raise ValueError("Delta record without a preceding keyframe")
+
+        count, = COUNT.unpack_from(payload, offset)
+        offset += COUNT.size
+        removed = np.frombuffer(payload, dtype=np.int64, count=count, offset=offset)
+        offset += count * 8
+        added, offset = unpack_arrays(payload, offset, ROW_DTYPES)
+        changed, offset = unpack_arrays(payload, offset, CHANGE_DTYPES)
+
+        table = self.table()
+        keep = ~np.isin(table.key, removed)
+        columns = {column: values[keep] for column, values in self.columns.items()}
+        keys = table.key[keep]
+        at = np.searchsorted(keys, changed["key"])
+        columns["cpu"][at] = changed["cpu"]
+        columns["memory"][at] = changed["memory"]
+        columns["ppid"][at] = changed["ppid"]
+        columns["name"][at] = [self.names.code(self.strings[code]) for code in changed["name"].tolist()]
+        added = self.rows_to_columns(added)
+        self.set_columns({column: np.concatenate((values, added[column])) for column, values in columns.items()})
+        return self.table()
+
+    def set_columns(self, columns):
+        table = ProcessTable(self.names, columns)
+        order = np.argsort(table.key, kind="stable")
+        self.columns = {column: values[order] for column, values in columns.items()}
+
+    def table(self):
+        return ProcessTable(self.names, self.columns)
+
+
+def read_records(path, offset=0):
+    # Yields (kind, wall time, payload); stops at a torn or corrupt tail
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            header = f.read(RECORD.size)
+            if len(header) < RECORD.size:
+                return
+            kind, when, size, crc = RECORD.unpack(header)
+            payload = f.read(size)
+            if len(payload) < size or zlib.crc32(payload) != crc:
+                return
+            yield kind, when, zlib.decompress(payload)
+
+
+def read_index(base):
+    with open(base + ".idx", "rb") as f:
+        data = f.read()
+    return [INDEX.unpack_from(data, offset) for offset in range(0, len(data) - INDEX.size + 1, INDEX.size)]
+
+
+def replay(directory, since=None, names=None):
+    # Yields (wall time, ProcessTable) for every recorded snapshot, starting at
+    # the last keyframe at or before `since` when given
+    names = names or NameTable()
+    segments = list_segments(directory)
+    for i, (_, base, _) in enumerate(segments):
+        offset = 0
+        if since is not None:
+            if i + 1 < len(segments):
+                following = read_index(segments[i + 1][1])
+                if following and following[0][0] <= since:
+                    continue
+            index = read_index(base)
+            at = bisect.bisect_right([when for when, _ in index], since) - 1
+            offset = index[at][1] if at >= 0 else 0
+        state = Replay(names)
+        for kind, when, payload in read_records(base + ".rec", offset):
+            table = state.apply(kind, payload)
+            if since is None or when >= since:
+                yield when, table
+
+
+def record(directory, interval, top=None, **options):
+    collector = make_collector()
+    if top:
+        collector.top = (top, "cpu")
+    recorder = Recorder(directory, **options)
+    next_tick = time.monotonic()
+    try:
+        while True:
+            recorder.write(collector.snapshot())
+            next_tick += interval
+            now = time.monotonic()
+            if next_tick <= now:
+                next_tick = now + interval - (now - next_tick) % interval
+            time.sleep(next_tick - now)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record process snapshots to disk, or dump a recording")
+    parser.add_argument("directory")
+    parser.add_argument("--dump", action="store_true", help="print the recording instead of recording")
+    parser.add_argument("--since", type=float, help="with --dump, start at this Unix time")
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--top", type=int, help="record only the top N processes by cpu")
+    parser.add_argument("--segment-mb", type=int, default=64)
+    parser.add_argument("--max-mb", type=int, default=1024)
+    args = parser.parse_args()
+
+    if args.dump:
+        for when, table in replay(args.directory, args.since):
+            stamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(when))
+            top = table.sorted("cpu", reverse=True).take(slice(0, 5))
+            busiest = ", ".join(f"{name}({pid}) {cpu:.1f}%" for pid, name, cpu, _ in top.rows())
+            print(f"{stamp}  {len(table):6d} processes  {busiest}")
+        return
+
+    record(args.directory, args.interval, args.top,
+           segment_bytes=args.segment_mb << 20, max_bytes=args.max_mb << 20)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import threading
+import time
+
+from metrics import Metrics
+
+# Seconds between refreshes of each per-process field. cpu is a rate and is
+# refreshed every tick; memory moves slowly and keeps its last value in between.
+# Name, user and command line are read once per process by the collectors.
+FIELD_PERIODS = {"cpu": 0.0, "memory": 3.0}
+
+
+class RefreshSchedule:
+    # Decides the sampler's period and which fields a tick refreshes. The period
+    # doubles, up to max_interval, when a scan takes more than budget of it, and
+    # halves back towards interval once scans are cheap and the machine is idle
+    # (total cpu under idle_cpu %). While the window is hidden it is at least
+    # hidden_interval.
+    def __init__(self, interval=1.0, max_interval=8.0, hidden_interval=5.0, budget=0.25, idle_cpu=10.0,
+                 periods=FIELD_PERIODS):
+        self.base = interval
+        self.interval = interval
+        self.max_interval = max_interval
+        self.hidden_interval = hidden_interval
+        self.budget = budget
+        self.idle_cpu = idle_cpu
+        self.periods = periods
+        self.hidden = False
+        self.refreshed = {}
+
+    def period(self):
+        return max(self.interval, self.hidden_interval) if self.hidden else self.interval
+
+    def due(self, now):
+        # Half a period of slack, so tick jitter does not push a field a whole tick late
+        slack = self.period() / 2
+        fields = {field for field, every in self.periods.items()
+                  if now - self.refreshed.get(field, float("-inf")) >= every - slack}
+        for field in fields:
+            self.refreshed[field] = now
+        return fields
+
+    def adjust(self, scan_seconds, busy):
+        if scan_seconds > self.budget * self.interval:
+            self.interval = min(self.max_interval, self.interval * 2)
+        elif busy < self.idle_cpu and scan_seconds < self.budget * self.interval / 2:
+            self.interval = max(self.base, self.interval / 2)
+        return self.period()
+
+
+class Sampler(threading.Thread):
+    # One long-lived collector thread. Ticks are scheduled against a monotonic
+    # timeline, so the period does not drift by the scan time, and only the most
+    # recent snapshot is kept for the consumer to pick up. The period itself
+    # comes from the schedule and may change after every tick.
+    def __init__(self, collector, interval=1.0, delay=0.0, metrics=None, schedule=None):
+        super().__init__(name="sampler", daemon=True)
+        self.collector = collector
+        self.schedule = schedule or RefreshSchedule(interval)
+        # Seconds before the first sample, e.g. after a quick scan on another thread
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.wake_event = threading.Event()
+        self.stopped = False
+        self.generation = 0
+        self.snapshot = None
+        self.metrics = metrics or Metrics()
+        # perf_counter() when the current snapshot was published, for hand-off latency
+        self.published = 0.0
+        # Callables fed every snapshot on this thread, e.g. a Recorder's write
+        self.sinks = []
+        self.sinks_lock = threading.Lock()
+
+    def run(self):
+        next_tick = time.monotonic() + self.delay
+        if self.delay and self.wake_event.wait(self.delay):
+            self.wake_event.clear()
+            next_tick = time.monotonic()
+        while not self.stopped:
+            fields = self.schedule.due(time.monotonic())
+            # Timed whether or not metrics are on: the schedule needs the scan time
+            started = time.perf_counter()
+            snapshot = self.collector.snapshot(fields=fields)
+            scan_seconds = time.perf_counter() - started
+            self.metrics.record("collect", started)
+            with self.lock:
+                self.snapshot = snapshot
+                self.generation += 1
+                self.published = self.metrics.mark()
+            with self.sinks_lock:
+                for sink in self.sinks:
+                    sink(snapshot)
+
+            interval = self.schedule.adjust(scan_seconds, float(snapshot.cpu.sum()))
+            next_tick += interval
+            now = time.monotonic()
+            if next_tick <= now:
+                # The scan overran one or more periods: skip them instead of bursting
+                next_tick = now + interval - (now - next_tick) % interval
+            if self.wake_event.wait(next_tick - now):
+                self.wake_event.clear()
+                next_tick = time.monotonic()
+
+    def latest(self):
+        with self.lock:
+            return self.generation, self.snapshot
+
+    def add_sink(self, sink):
+        with self.sinks_lock:
+            self.sinks = self.sinks + [sink]
+
+    def remove_sink(self, sink):
+        # Returns once the sink is no longer being called
+        with self.sinks_lock:
+            self.sinks = [s for s in self.sinks if s != sink]
+
+    def refresh(self):
+        # Take the next sample now and restart the timeline from it
+        self.wake_event.set()
+
+    def stop(self):
+        self.stopped = True
+        self.wake_event.set()
@@ -0,0 +1,141 @@
+import operator
+import re
+import shlex
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from proctable import ProcessTable
+
+# Query field -> table column
+FIELDS = {"pid": "pid", "name": "name", "user": "user", "cmd": "cmdline", "command": "cmdline",
+          "cpu": "cpu", "cpu1m": "cpu_1m", "cpu5m": "cpu_5m", "mem": "memory", "memory": "memory"}
+NUMERIC_FIELDS = ("pid", "cpu", "cpu_1m", "cpu_5m", "memory")
+NUMERIC_OPS = {"=": operator.eq, "!=": operator.ne, ">": operator.gt, "<": operator.lt,
+               ">=": operator.ge, "<=": operator.le}
+TERM = re.compile(r"^([a-z][a-z0-9]*)(~|!=|>=|<=|=|>|<)(.*)$")
+
+
+def trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    # Maps every trigram of a lowercased text to the ids containing it; a lookup
+    # intersects the posting sets and only confirms the few survivors by substring.
+    def __init__(self):
+        self.postings = defaultdict(set)
+        self.texts = {}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def add(self, id, text):
+        text = text.lower()
+        self.texts[id] = text
+        for gram in trigrams(text):
+            self.postings[gram].add(id)
+
+    def remove(self, id):
+        for gram in trigrams(self.texts.pop(id)):
+            ids = self.postings[gram]
+            ids.discard(id)
+            if not ids:
+                del self.postings[gram]
+
+    def find(self, term, exact=False):
+        term = term.lower()
+        grams = trigrams(term)
+        if grams:
+            sets = sorted((self.postings.get(gram, ()) for gram in grams), key=len)
+            candidates = set(sets[0]).intersection(*sets[1:])
+        else:
+            candidates = self.texts
+        if exact:
+            return [id for id in candidates if self.texts[id] == term]
+        return [id for id in candidates if term in self.texts[id]]
+
+
+def parse_query(text):
+    # "name~python cpu>5 mem>500 user=ci": whitespace separated terms, all of
+    # which must match. A bare word matches the name, or the pid if numeric.
+    terms = []
+    for token in shlex.split(text):
+        match = TERM.match(token)
+        if match is None:
+            terms.append((None, "~", token))
+            continue
+        field, op, value = match.groups()
+        if field not in FIELDS:
+            raise ValueError(f"Unknown search field: {field}")
+        column = FIELDS[field]
+        if column in NUMERIC_FIELDS:
+            if op == "~":
+                raise ValueError(f"'~' does not apply to numeric field {field}")
+            try:
+                value = float(value)
+            except ValueError:
+                raise ValueError(f"Expected a number after {field}{op}") from None
+        elif op not in ("~", "=", "!="):
+            raise ValueError(f"'{op}' does not apply to text field {field}")
+        terms.append((column, op, value))
+    return terms
+
+
+class SearchIndex:
+    # Incremental index over the current snapshot. Interned names and users are
+    # indexed by NameTable code as the vocabulary grows; command lines are indexed
+    # as distinct strings, reference counted so they leave when their processes do.
+    def __init__(self, names):
+        self.names = names
+        self.name_index = TrigramIndex()
+        self.indexed_names = 0
+        self.cmdline_index = TrigramIndex()
+        self.cmdline_refs = Counter()
+        self.table = ProcessTable.empty(names)
+
+    def update(self, table):
+        names = self.names.names
+        for code in range(self.indexed_names, len(names)):
+            self.name_index.add(code, names[code])
+        self.indexed_names = len(names)
+
+        added, removed, _, _ = table.diff(self.table)
+        for cmdline in self.table.cmdline[removed].tolist():
+            self.cmdline_refs[cmdline] -= 1
+            if not self.cmdline_refs[cmdline]:
+                del self.cmdline_refs[cmdline]
+                self.cmdline_index.remove(cmdline)
+        for cmdline in table.cmdline[added].tolist():
+            if not self.cmdline_refs[cmdline]:
+                self.cmdline_index.add(cmdline, cmdline)
+            self.cmdline_refs[cmdline] += 1
+        self.table = table
+
+    def match(self, table, column, op, value):
+        if column is None:
+            mask = np.isin(table.name, self.name_index.find(value))
+            if value.isdigit():
+                mask |= table.pid == int(value)
+            return mask
+        if column in NUMERIC_FIELDS:
+            return NUMERIC_OPS[op](table.columns[column], value)
+
+        exact = op != "~"
+        if column == "cmdline":
+            found = np.array(self.cmdline_index.find(value, exact), dtype=object)
+            mask = np.isin(table.cmdline, found)
+        else:
+            mask = np.isin(table.columns[column], self.name_index.find(value, exact))
+        return ~mask if op == "!=" else mask
+
+    def search(self, text, table=None):
+        # Raises ValueError for a malformed query
+        table = self.table if table is None else table
+        terms = parse_query(text)
+        if not terms:
+            return table
+        mask = np.ones(len(table), dtype=bool)
+        for column, op, value in terms:
+            mask &= self.match(table, column, op, value)
+        return table.filter(mask)
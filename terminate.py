@@ -0,0 +1,78 @@
+import threading
+from collections import namedtuple
+
+from collector import require_psutil
+
+# Lists of pids by outcome. missing: already gone before a signal was sent;
+# survived: still running after the last wait
+Termination = namedtuple("Termination", "terminated killed denied missing survived")
+
+
+class TerminateJob(threading.Thread):
+    # Signals a set of processes off the UI thread. Every target is waited on at
+    # once with psutil.wait_procs, so n processes take one timeout, not n. With
+    # escalate, processes that outlive SIGTERM get SIGKILL and a second wait.
+    # The outcome is in .result once the thread has finished.
+    def __init__(self, pids, kill=False, tree=False, escalate=False, timeout=3.0):
+        super().__init__(name="terminate", daemon=True)
+        self.pids = pids
+        self.kill = kill
+        self.tree = tree
+        self.escalate = escalate and not kill
+        self.timeout = timeout
+        self.result = None
+
+    def targets(self, psutil, missing):
+        processes = {}
+        for pid in self.pids:
+            try:
+                process = psutil.Process(pid)
+                family = process.children(recursive=True) if self.tree else []
+            except psutil.NoSuchProcess:
+                missing.append(pid)
+                continue
+            except psutil.AccessDenied:
+                family = []
+            # Descendants first, so none is re-parented and missed while its parent exits
+            for member in family + [process]:
+                processes.setdefault(member.pid, member)
+        return list(processes.values())
+
+    def signal(self, psutil, processes, kill, denied, missing):
+        sent = []
+        for process in processes:
+            try:
+                if kill:
+                    process.kill()
+                else:
+                    process.terminate()
+                sent.append(process)
+            except psutil.NoSuchProcess:
+                missing.append(process.pid)
+            except psutil.AccessDenied:
+                denied.append(process.pid)
+        return sent
+
+    def run(self):
+        psutil = require_psutil()
+        denied, missing = [], []
+        processes = self.targets(psutil, missing)
+        sent = self.signal(psutil, processes, self.kill, denied, missing)
+        gone, alive = psutil.wait_procs(sent, timeout=self.timeout)
+        done = [process.pid for process in gone]
+        terminated, killed = ([], done) if self.kill else (done, [])
+        if self.escalate and alive:
+            sent = self.signal(psutil, alive, True, denied, missing)
+            gone, alive = psutil.wait_procs(sent, timeout=self.timeout)
+            killed = [process.pid for process in gone]
+        self.result = Termination(terminated, killed, denied, missing, [process.pid for process in alive])
+
+    def summary(self):
+        result = self.result
+        lines = []
+        for label, pids in (("Terminated", result.terminated), ("Killed", result.killed),
+                            ("Access denied", result.denied), ("Already gone", result.missing),
+                            ("Still running", result.survived)):
+            if pids:
+                lines.append(f"{label} ({len(pids)}): " + ", ".join(str(pid) for pid in sorted(pids)))
+        return "\n".join(lines) or "Nothing to do"
@@ -0,0 +1,227 @@
+import argparse
+import curses
+import json
+import sys
+import time
+
+from collector import make_collector, make_system_collector
+from history import History
+from search import SearchIndex
+
+# Terminal front end for machines without a display: a top-like curses screen,
+# or --json for a single snapshot. It shares collection, search and sorting with
+# the GUI and never imports tkinter or matplotlib.
+
+# (field, heading, width, format); the last column takes the remaining width
+SCREEN_COLUMNS = (("pid", "PID", 7, "{:>7}"), ("user", "USER", 10, "{:<10.10}"), ("cpu", "CPU%", 6, "{:>6.1f}"),
+                  ("cpu_1m", "CPU1M", 6, "{:>6.1f}"), ("memory", "MEM MB", 9, "{:>9.1f}"),
+                  ("name", "NAME", 16, "{:<16.16}"), ("cmdline", "COMMAND", 0, "{}"))
+JSON_COLUMNS = ("pid", "ppid", "name", "user", "cpu", "memory", "cmdline")
+SORT_FIELDS = ("pid", "name", "user", "cpu", "cpu_1m", "memory", "cmdline")
+# Numbers sort largest first unless reversed; text sorts A to Z
+DESCENDING = ("cpu", "cpu_1m", "memory")
+SORT_KEYS = {ord("P"): "cpu", ord("M"): "memory", ord("N"): "pid", ord("U"): "user", ord("C"): "cmdline"}
+HELP = "q quit  / filter  P cpu  M mem  N pid  U user  C command  r reverse"
+
+
+def sort_order(field, reverse):
+    return field, (field in DESCENDING) != reverse
+
+
+class Pipeline:
+    # collect -> history -> search -> sort, exactly as the GUI consumes a snapshot
+    def __init__(self, backend=None, top=None):
+        self.collector = make_collector(backend)
+        self.collector.top = top
+        self.history = History()
+        self.search_index = SearchIndex(self.collector.names)
+        self.snapshot = None
+
+    def sample(self):
+        snapshot = self.collector.snapshot()
+        self.history.update(snapshot)
+        self.snapshot = self.history.annotate(snapshot)
+        self.search_index.update(self.snapshot)
+
+    def view(self, query, sort):
+        # Raises ValueError for a malformed query
+        return self.search_index.search(query, self.snapshot).sorted(*sort)
+
+
+def dump_json(args):
+    sort = sort_order(args.sort, args.reverse)
+    top = None
+    if args.limit and not args.filter and args.sort in ("cpu", "memory") and sort[1]:
+        # Only the winners need their details resolved
+        top = (args.limit, args.sort)
+    pipeline = Pipeline(args.backend, top)
+    if args.interval > 0:
+        # cpu% is a rate, so it needs a first sample to measure from
+        pipeline.sample()
+        time.sleep(args.interval)
+    pipeline.sample()
+    try:
+        table = pipeline.view(args.filter, sort)
+    except ValueError as e:
+        sys.exit(f"top.py: {e}")
+    if args.limit:
+        table = table.take(slice(0, args.limit))
+    json.dump({"time": time.time(), "processes": table.records(JSON_COLUMNS)}, sys.stdout)
+    sys.stdout.write("\n")
+
+
+class TopScreen:
+    def __init__(self, screen, args):
+        self.screen = screen
+        self.interval = args.interval or 1.0
+        self.pipeline = Pipeline(args.backend)
+        self.system_collector = make_system_collector(args.backend)
+        self.system = None
+        self.sort_field = args.sort
+        self.reverse = args.reverse
+        self.query = args.filter
+        self.message = ""
+        self.table = None
+        self.first = 0
+
+    def sample(self):
+        self.pipeline.sample()
+        self.system = self.system_collector.sample()
+        self.update_view()
+
+    def update_view(self):
+        try:
+            self.table = self.pipeline.view(self.query, sort_order(self.sort_field, self.reverse))
+        except ValueError as e:
+            self.message = str(e)
+            self.query = ""
+            self.table = self.pipeline.view("", sort_order(self.sort_field, self.reverse))
+
+    def page_rows(self):
+        return max(1, self.screen.getmaxyx()[0] - 3)
+
+    def render(self):
+        screen = self.screen
+        width = screen.getmaxyx()[1]
+        screen.erase()
+        table = self.table
+        self.first = max(0, min(self.first, len(table) - self.page_rows()))
+
+        system = self.system
+        summary = (f"{time.strftime('%H:%M:%S')}  {len(self.pipeline.snapshot)} processes, {len(table)} shown  "
+                   f"cpu {system.cpu:5.1f}%  mem {system.memory_used:.0f}/{self.system_collector.memory_total:.0f} MB")
+        self.put(0, summary, width)
+        if self.message:
+            self.put(1, self.message, width, curses.A_BOLD)
+        else:
+            self.put(1, f"filter: {self.query}" if self.query else HELP, width)
+
+        heading = " ".join(f"{title:<{size}}" if size else title for _, title, size, _ in SCREEN_COLUMNS)
+        self.put(2, heading, width, curses.A_REVERSE)
+
+        fields = [column[0] for column in SCREEN_COLUMNS]
+        formats = [column[3] for column in SCREEN_COLUMNS]
+        rows = table.take(slice(self.first, self.first + self.page_rows()))
+        for y, row in enumerate(rows.display_rows(fields), 3):
+            line = " ".join(fmt.format(value) for fmt, value in zip(formats, row))
+            self.put(y, line, width)
+        screen.refresh()
+
+    def put(self, y, text, width, attr=curses.A_NORMAL):
+        # Writing the bottom-right cell raises in curses even though it succeeds
+        try:
+            self.screen.addnstr(y, 0, text, max(0, width - 1), attr)
+        except curses.error:
+            pass
+
+    def prompt_filter(self):
+        width = self.screen.getmaxyx()[1]
+        self.screen.move(1, 0)
+        self.screen.clrtoeol()
+        self.put(1, "filter: ", width)
+        curses.echo()
+        try:
+            curses.curs_set(1)
+        except curses.error:
+            pass
+        self.screen.timeout(-1)
+        text = self.screen.getstr(1, 8).decode("utf-8", "replace")
+        curses.noecho()
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        self.query = text.strip()
+        self.first = 0
+        self.update_view()
+
+    def handle_key(self, key):
+        self.message = ""
+        page = self.page_rows()
+        if key in (ord("q"), ord("Q")):
+            return False
+        if key == ord("/"):
+            self.prompt_filter()
+        elif key in SORT_KEYS:
+            self.sort_field = SORT_KEYS[key]
+            self.update_view()
+        elif key == ord("r"):
+            self.reverse = not self.reverse
+            self.update_view()
+        elif key == curses.KEY_UP:
+            self.first -= 1
+        elif key == curses.KEY_DOWN:
+            self.first += 1
+        elif key == curses.KEY_PPAGE:
+            self.first -= page
+        elif key == curses.KEY_NPAGE:
+            self.first += page
+        elif key == curses.KEY_HOME:
+            self.first = 0
+        elif key == curses.KEY_END:
+            self.first = len(self.table)
+        return True
+
+    def run(self):
+        try:
+            curses.curs_set(0)
+        except curses.error:
+            pass
+        # First paint straight from one scan; cpu% fills in from the next tick on
+        self.sample()
+        self.render()
+        next_tick = time.monotonic() + self.interval
+        while True:
+            self.screen.timeout(max(0, int((next_tick - time.monotonic()) * 1000)))
+            key = self.screen.getch()
+            if key == -1:
+                self.sample()
+                next_tick += self.interval
+                now = time.monotonic()
+                if next_tick <= now:
+                    next_tick = now + self.interval - (now - next_tick) % self.interval
+            elif not self.handle_key(key):
+                return
+            self.render()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show processes in the terminal, or dump them as JSON")
+    parser.add_argument("--json", action="store_true", help="print one snapshot as JSON and exit")
+    parser.add_argument("--interval", type=float, default=1.0,
+                        help="seconds between refreshes; with --json, the cpu measuring window (0 to skip)")
+    parser.add_argument("--sort", choices=SORT_FIELDS, default="cpu")
+    parser.add_argument("-r", "--reverse", action="store_true", help="flip the sort direction")
+    parser.add_argument("--filter", default="", help="search query, e.g. 'name~python cpu>5'")
+    parser.add_argument("--limit", type=int, help="with --json, at most this many processes")
+    parser.add_argument("--backend", choices=("proc", "psutil", "fake"))
+    args = parser.parse_args()
+
+    if args.json:
+        dump_json(args)
+    else:
+        curses.wrapper(lambda screen: TopScreen(screen, args).run())
+
+
+if __name__ == "__main__":
+    main()
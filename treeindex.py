@@ -0,0 +1,126 @@
+import tkinter as tk
+
+import numpy as np
+
+from metrics import Metrics
+
+
+class TreeIndex:
+    # Python-side view of what a flat Treeview displays: the shown table, the item
+    # id of each of its rows, and a (pid, start) -> item id map. A refresh diffs
+    # against this instead of asking Tcl, and only pushes cells that changed.
+    def __init__(self, tree, columns, fields, table, metrics=None):
+        self.tree = tree
+        self.columns = columns
+        self.fields = fields
+        self.metrics = metrics or Metrics()
+        self.sort = None
+        self.clear(table)
+
+    def clear(self, table):
+        self.table = table
+        self.items = np.empty(0, dtype=object)
+        self.index = {}
+
+    def __len__(self):
+        return len(self.table)
+
+    def iid(self, pid, start):
+        return self.index.get((pid, start))
+
+    def changed_cells(self, table, new_index, old_index):
+        # One boolean column per displayed cell, True where the shown value is stale
+        prev = self.table
+        return np.column_stack([
+            table.compare_values(column)[new_index] != prev.compare_values(column)[old_index]
+            for column in self.fields
+        ]).reshape(len(new_index), len(self.fields))
+
+    def update(self, table, sort=None):
+        started = self.metrics.mark()
+        added, removed, new_index, old_index = table.diff(self.table)
+        # Keep surviving rows in the order they are currently displayed
+        shown_order = np.argsort(old_index, kind="stable")
+        new_index = new_index[shown_order]
+        old_index = old_index[shown_order]
+
+        changed = self.changed_cells(table, new_index, old_index)
+        dirty = np.flatnonzero(changed.any(axis=1))
+
+        items = np.empty(len(table), dtype=object)
+        items[new_index] = self.items[old_index]
+        self.metrics.record("diff", started)
+
+        started = self.metrics.mark()
+        if len(removed):
+            self.tree.delete(*self.items[removed])
+            for pid, start in zip(self.table.pid[removed].tolist(), self.table.start[removed].tolist()):
+                del self.index[(pid, start)]
+
+        if len(dirty):
+            rows = table.take(new_index[dirty])
+            cells = changed[dirty].tolist()
+            for row, cells, iid in zip(rows.display_rows(self.fields), cells, items[new_index[dirty]]):
+                if cells.count(True) == 1:
+                    col = cells.index(True)
+                    self.tree.set(iid, self.columns[col], row[col])
+                else:
+                    self.tree.item(iid, values=row)
+
+        if sort is not None and sort == self.sort:
+            order, placed = self.merge_sorted(table, sort, new_index, old_index, added)
+        else:
+            order = np.concatenate((new_index, added))
+            placed = np.arange(len(new_index), len(order))
+
+        # Survivors that change position are detached first, so that placing rows in
+        # ascending final position makes every target index exact
+        moved = order[placed]
+        moved_items = [iid for iid in items[moved] if iid is not None]
+        if moved_items:
+            self.tree.detach(*moved_items)
+
+        if len(placed):
+            rows = table.take(moved)
+            for position, i, row, pid, start in zip(placed.tolist(), moved.tolist(), rows.display_rows(self.fields),
+                                                    rows.pid.tolist(), rows.start.tolist()):
+                if items[i] is None:
+                    iid = self.tree.insert("", position, values=row)
+                    items[i] = iid
+                    self.index[(pid, start)] = iid
+                else:
+                    self.tree.move(items[i], '', position)
+
+        self.table = table.take(order)
+        self.items = items[order]
+        if sort is not None and sort != self.sort:
+            self.reorder(self.table.argsort(*sort))
+        self.sort = sort
+        self.metrics.record("render", started)
+        return len(added) + len(removed) + len(dirty)
+
+    def merge_sorted(self, table, sort, new_index, old_index, added):
+        # The shown rows are already sorted. Rows whose sort key is unchanged keep
+        # their relative order; only new rows and rows whose key moved are placed
+        # into it by binary search.
+        column, reverse = sort
+        sign = -1 if reverse else 1
+        keys = table.sort_values(column) * sign
+        moved = table.compare_values(column)[new_index] != self.table.compare_values(column)[old_index]
+        staying = new_index[~moved]
+        moving = np.concatenate((new_index[moved], added))
+        moving = moving[np.argsort(keys[moving], kind="stable")]
+
+        placed = np.searchsorted(keys[staying], keys[moving], side="right") + np.arange(len(moving))
+        order = np.empty(len(staying) + len(moving), dtype=np.int64)
+        rest = np.ones(len(order), dtype=bool)
+        rest[placed] = False
+        order[placed] = moving
+        order[rest] = staying
+        return order, placed
+
+    def reorder(self, order):
+        self.table = self.table.take(order)
+        self.items = self.items[order]
+        for index, iid in enumerate(self.items):
+            self.tree.move(iid, '', index)
@@ -0,0 +1,147 @@
+import tkinter as tk
+
+
+class VirtualList:
+    # Drives a ttk.Treeview as a small pool of rows laid over a ProcessTable.
+    # Only the rows in the viewport exist as Tcl items, so the cost of a refresh
+    # depends on the window height rather than on the number of processes.
+    def __init__(self, tree, scrollbar, fields):
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.fields = fields
+        self.table = None
+        self.active = False
+        self.first = 0
+        self.rows = 1
+        self.row_height = 20
+        self.header_height = 25
+        self.pool = []
+        self.pool_values = []
+        self.pool_pids = []
+        self.selected = set()
+
+        self.tree.bind("<Configure>", self.on_configure, add="+")
+        self.tree.bind("<MouseWheel>", self.on_mousewheel, add="+")
+        self.tree.bind("<Button-4>", self.on_mousewheel, add="+")
+        self.tree.bind("<Button-5>", self.on_mousewheel, add="+")
+        self.tree.bind("<Prior>", lambda e: self.on_key(-1, "pages"), add="+")
+        self.tree.bind("<Next>", lambda e: self.on_key(1, "pages"), add="+")
+        self.tree.bind("<<TreeviewSelect>>", self.on_select, add="+")
+
+    def attach(self):
+        self.active = True
+        self.first = 0
+        self.selected = set()
+        self.tree.configure(yscrollcommand="")
+        self.scrollbar.configure(command=self.yview)
+        self.resize()
+
+    def detach(self):
+        self.active = False
+        self.clear()
+        self.tree.configure(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.configure(command=self.tree.yview)
+
+    def clear(self):
+        if self.pool:
+            self.tree.delete(*self.pool)
+        self.pool = []
+        self.pool_values = []
+        self.pool_pids = []
+
+    def set_table(self, table):
+        self.table = table
+        self.render()
+
+    def resize(self):
+        height = self.tree.winfo_height()
+        if height > 1:
+            self.rows = max(1, (height - self.header_height) // self.row_height)
+        self.render()
+
+    def render(self):
+        if not self.active or self.table is None:
+            return
+
+        total = len(self.table)
+        self.first = max(0, min(self.first, total - self.rows))
+        visible = self.table.take(slice(self.first, self.first + self.rows))
+        values = list(visible.display_rows(self.fields))
+
+        if len(self.pool) > len(values):
+            self.tree.delete(*self.pool[len(values):])
+            del self.pool[len(values):]
+            del self.pool_values[len(values):]
+        while len(self.pool) < len(values):
+            row = values[len(self.pool)]
+            self.pool.append(self.tree.insert("", tk.END, values=row))
+            self.pool_values.append(row)
+
+        # Only push the cells of slots whose contents actually changed
+        for slot, row in enumerate(values):
+            if self.pool_values[slot] != row:
+                self.tree.item(self.pool[slot], values=row)
+                self.pool_values[slot] = row
+        self.pool_pids = visible.pid.tolist()
+
+        selection = [iid for iid, pid in zip(self.pool, self.pool_pids) if pid in self.selected]
+        if set(selection) != set(self.tree.selection()):
+            self.tree.selection_set(selection)
+
+        if total:
+            self.scrollbar.set(self.first / total, (self.first + len(values)) / total)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+        if self.pool:
+            self.measure()
+
+    def measure(self):
+        # Row geometry depends on theme and font, so read it back from Tk
+        bbox = self.tree.bbox(self.pool[0])
+        if bbox and (bbox[3] != self.row_height or bbox[1] != self.header_height):
+            self.row_height = bbox[3]
+            self.header_height = bbox[1]
+            self.tree.after_idle(self.resize)
+
+    def scroll_to(self, first):
+        first = max(0, min(int(first), len(self.table) - self.rows))
+        if first != self.first:
+            self.first = first
+            self.render()
+
+    def yview(self, *args):
+        if self.table is None:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.table))
+        elif args[0] == "scroll":
+            step = self.rows if args[2] == "pages" else 1
+            self.scroll_to(self.first + int(args[1]) * step)
+
+    def on_configure(self, event):
+        if self.active:
+            self.resize()
+
+    def on_mousewheel(self, event):
+        if not self.active:
+            return None
+        if event.num == 4 or event.delta > 0:
+            self.yview("scroll", -3, "units")
+        else:
+            self.yview("scroll", 3, "units")
+        return "break"
+
+    def on_key(self, amount, what):
+        if not self.active:
+            return None
+        self.yview("scroll", amount, what)
+        return "break"
+
+    def on_select(self, event):
+        if not self.active:
+            return
+        visible = set(self.pool_pids)
+        selection = set(self.tree.selection())
+        chosen = {pid for iid, pid in zip(self.pool, self.pool_pids) if iid in selection}
+        self.selected = (self.selected - visible) | chosen